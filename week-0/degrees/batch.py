@@ -0,0 +1,154 @@
+"""
+Batch degrees of separation.
+
+Reads one pair of people per line (tab separated person IDs or names) from
+a file or stdin, and writes one JSON object per line with the result.
+Queries are grouped by source so every source needs a single breadth-first
+search, and sources are spread across a pool of processes that share the
+loaded data.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+
+import degrees
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs of raw fields from lines of `f`,
+    skipping blank lines.
+    """
+    for line in f:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        fields = line.split("\t")
+        if len(fields) != 2:
+            yield line, None
+        else:
+            yield fields[0].strip(), fields[1].strip()
+
+
+def resolve(field):
+    """
+    Returns the person_id for a field holding either a person_id or an
+    unambiguous name, or None.
+    """
+    if field is None:
+        return None
+    if field in degrees.people:
+        return field
+    person_ids = degrees.names.get(field.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+def search_tree(source, targets):
+    """
+    Breadth-first search from `source` until every person in `targets`
+    has been reached (or the component is exhausted).
+    Returns a dictionary mapping reached person_ids to (movie_id, parent).
+    """
+    parents = {source: None}
+    remaining = set(targets) - {source}
+    layer = [source]
+    while layer and remaining:
+        next_layer = []
+        for person_id in layer:
+            for movie_id, neighbor in degrees.neighbors_for_person(person_id):
+                if neighbor not in parents:
+                    parents[neighbor] = (movie_id, person_id)
+                    remaining.discard(neighbor)
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return parents
+
+
+def path_from_tree(parents, target):
+    """
+    Returns the (movie_id, person_id) path to `target` in a search tree,
+    or None if it was not reached.
+    """
+    if target not in parents:
+        return None
+    path = []
+    while parents[target] is not None:
+        movie_id, parent = parents[target]
+        path.append((movie_id, target))
+        target = parent
+    path.reverse()
+    return path
+
+
+def answer(group):
+    """
+    Answers every query sharing one source with a single search.
+    `group` is (source, [(line number, target), ...]).
+    """
+    source, queries = group
+    parents = search_tree(source, [target for _, target in queries])
+    results = []
+    for number, target in queries:
+        path = path_from_tree(parents, target)
+        results.append({
+            "line": number,
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path
+        })
+    return results
+
+
+def init_worker(directory):
+    """
+    Loads the data in a worker process, unless it was inherited on fork.
+    Pool workers are daemonic and cannot start processes, so the files
+    are read in the worker itself.
+    """
+    if len(degrees.people) == 0:
+        degrees.load_data(directory, workers=1)
+
+
+def main():
+    if not 2 <= len(sys.argv) <= 4:
+        sys.exit("Usage: python batch.py directory [pairs.tsv|-] [processes]")
+    directory = sys.argv[1]
+    filename = sys.argv[2] if len(sys.argv) >= 3 else "-"
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else os.cpu_count()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, progress=True)
+    print("Data loaded.", file=sys.stderr)
+
+    # Group queries by source, reporting unresolvable lines right away
+    groups = {}
+    f = sys.stdin if filename == "-" else open(filename, encoding="utf-8")
+    with f:
+        for number, (source_field, target_field) in enumerate(read_pairs(f), 1):
+            source = resolve(source_field)
+            target = resolve(target_field)
+            if source is None or target is None:
+                print(json.dumps({
+                    "line": number,
+                    "source": source_field,
+                    "target": target_field,
+                    "error": "person not found"
+                }), flush=True)
+                continue
+            groups.setdefault(source, []).append((number, target))
+
+    # Stream results as each source finishes
+    with multiprocessing.Pool(processes, init_worker, (directory,)) as pool:
+        for results in pool.imap_unordered(answer, groups.items()):
+            for result in results:
+                print(json.dumps(result))
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
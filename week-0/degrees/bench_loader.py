@@ -0,0 +1,82 @@
+"""
+Benchmark the parallel CSV loader against the original one.
+
+Generates a synthetic dataset in a temporary directory (by default a
+million rows of stars.csv) and times both loaders on it.
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+import degrees
+import loader
+
+
+def generate(directory, num_stars, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv with `num_stars` rows of
+    stars and proportionally fewer people and movies.
+    """
+    rng = random.Random(seed)
+    num_people = max(1, num_stars // 4)
+    num_movies = max(1, num_stars // 10)
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(num_people):
+            writer.writerow([i, f"Person {i % (num_people // 2 + 1)}", 1900 + i % 120])
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(num_movies):
+            writer.writerow([i, f"Movie {i}", 1920 + i % 100])
+
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for _ in range(num_stars):
+            writer.writerow([rng.randrange(num_people), rng.randrange(num_movies)])
+
+
+def timed(load, directory):
+    names, people, movies = {}, {}, {}
+    start = time.perf_counter()
+    load(directory, names, people, movies)
+    return time.perf_counter() - start, (names, people, movies)
+
+
+def original(directory, names, people, movies):
+    degrees.names, degrees.people, degrees.movies = names, people, movies
+    degrees.load_csv(directory)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python bench_loader.py [stars]")
+    num_stars = int(sys.argv[1]) if len(sys.argv) == 2 else 1000000
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating {num_stars:,} star rows...")
+        generate(directory, num_stars)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"Dataset: {size / 1e6:.1f} MB")
+
+        old_time, old_data = timed(original, directory)
+        new_time, new_data = timed(loader.load, directory)
+        if old_data != new_data:
+            sys.exit("Loaders disagree on the loaded data")
+
+    print(f"Original loader: {old_time:.2f}s ({num_stars / old_time:,.0f} star rows/s)")
+    workers = min(3, os.cpu_count() or 1)
+    print(f"Parallel loader ({workers} workers): {new_time:.2f}s ({num_stars / new_time:,.0f} star rows/s)")
+    print(f"Speedup: {old_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
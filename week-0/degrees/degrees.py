@@ -1,7 +1,12 @@
 import csv
+import os
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import loader
+from graph import CoStarGraph, PeopleView, MoviesView, NamesView, SNAPSHOT_NAME
+from landmarks import LandmarkIndex, LANDMARKS_NAME
+from nameindex import NameIndex
+from util import Node, DequeQueueFrontier, PriorityFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,10 +17,42 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact co-star graph, set when a binary snapshot is available
+graph = None
 
-def load_data(directory):
+# Landmark distance index, set when one has been built for the data
+landmarks = None
+
+# Prefix and trigram index over the keys of `names`, built on first use
+name_index = None
+
+
+def load_data(directory, workers=None, progress=False):
+    """
+    Load data from CSV files into memory, with `workers` processes and
+    optionally reporting rows/s progress on stderr (see loader.py).
+    If the directory contains a graph snapshot (see graph.py), it is
+    memory-mapped instead and the dictionaries above become views over it.
+    A landmark index (see landmarks.py) is loaded too if one exists.
+    """
+    global graph, names, people, movies, name_index
+
+    snapshot = os.path.join(directory, SNAPSHOT_NAME)
+    if os.path.exists(snapshot):
+        graph = CoStarGraph.load(snapshot)
+        names = NamesView(graph)
+        people = PeopleView(graph)
+        movies = MoviesView(graph)
+    else:
+        loader.load(directory, names, people, movies, workers, progress)
+    load_landmarks(directory)
+    name_index = None
+
+
+def load_csv(directory):
     """
-    Load data from CSV files into memory.
+    Load data from CSV files into the dictionaries above, one row at a time.
+    Kept as the reference for loader.py, which load_data uses instead.
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
@@ -52,6 +89,28 @@ def load_data(directory):
                 pass
 
 
+def load_landmarks(directory):
+    """
+    Load the landmark index for the data, if one has been built.
+    """
+    global landmarks
+
+    filename = os.path.join(directory, LANDMARKS_NAME)
+    if not os.path.exists(filename):
+        landmarks = None
+        return
+
+    if graph is not None:
+        index_of = graph.person_index
+    else:
+        index_of = {
+            person_id: i for i, person_id in enumerate(sorted(people))
+        }.get
+    landmarks = LandmarkIndex.load(filename, index_of)
+    if landmarks.num_people != len(people):
+        raise Exception(f"{filename} was built for different data")
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -59,7 +118,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, progress=True)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -84,43 +143,171 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=True, frontier_class=DequeQueueFrontier,
+                  use_landmarks=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
     If no possible path, returns None.
+
+    By default searches from both ends at once and stops where the two
+    searches meet; pass `bidirectional=False` for a one-sided search.
+    `frontier_class` chooses the frontier used to hold each search layer.
+    If a landmark index is loaded, unconnected people are answered without
+    searching. Pass `use_landmarks=True` to search with landmark A* instead;
+    it expands fewer people but pays for a heuristic at every one of them,
+    so the bidirectional search is faster on real data.
+    """
+    if source == target:
+        return []
+    if landmarks is not None:
+        if not landmarks.connected(source, target):
+            return None
+        if use_landmarks:
+            return landmark_search(source, target)
+    if bidirectional:
+        return bidirectional_search(source, target, frontier_class)
+
+    explored = set()
+    frontier = frontier_class()
+    frontier.add(Node(source, None, None))
+    explored.add(source)
+
+    while not frontier.empty():
+        node = frontier.remove()
+        for action, state in neighbors_for_person(node.state):
+            if state in explored:
+                continue
+            child = Node(state, node, action)
+            if state == target:
+                return path_to(child)
+            explored.add(state)
+            frontier.add(child)
+
+    return None
+
+
+def bidirectional_search(source, target, frontier_class=DequeQueueFrontier):
+    """
+    Breadth-first search from the source and the target at the same time,
+    always expanding one whole layer of the smaller side. Returns the path
+    in the same format as `shortest_path`, or None.
+    """
+    # Each side maps the states it has reached to their search nodes
+    forward = {source: Node(source, None, None)}
+    backward = {target: Node(target, None, None)}
+
+    forward_layer = frontier_class()
+    forward_layer.add(forward[source])
+    backward_layer = frontier_class()
+    backward_layer.add(backward[target])
+    forward_size = backward_size = 1
+
+    while forward_size and backward_size:
+
+        # Expand whichever side has the fewer states waiting
+        expand_forward = forward_size <= backward_size
+        if expand_forward:
+            layer, reached, other = forward_layer, forward, backward
+        else:
+            layer, reached, other = backward_layer, backward, forward
+
+        next_layer = frontier_class()
+        next_size = 0
+        best = None
+        while not layer.empty():
+            node = layer.remove()
+            for action, state in neighbors_for_person(node.state):
+                if state in other:
+
+                    # Orient the meeting edge from the source's side
+                    if expand_forward:
+                        meeting = (forward[node.state], action, backward[state])
+                    else:
+                        meeting = (forward[state], action, node)
+                    path = join_paths(*meeting)
+                    if best is None or len(path) < len(best):
+                        best = path
+                elif state not in reached:
+                    child = Node(state, node, action)
+                    reached[state] = child
+                    next_layer.add(child)
+                    next_size += 1
+
+        # Meetings found within one layer can differ in length,
+        # so the whole layer is expanded and the shortest one kept
+        if best is not None:
+            return best
+
+        if expand_forward:
+            forward_layer, forward_size = next_layer, next_size
+        else:
+            backward_layer, backward_size = next_layer, next_size
+
+    return None
+
+
+def landmark_search(source, target):
+    """
+    A* search guided by the landmark lower bounds. States whose estimated
+    total exceeds the landmark upper bound are never added to the frontier.
+    """
+    estimate = landmarks.heuristic(target)
+
+    lower, upper = landmarks.bounds(source, target)
+    cost = {source: 0}
+    explored = set()
+    frontier = PriorityFrontier()
+    frontier.add(Node(source, None, None), lower)
+
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.state == target:
+            return path_to(node)
+        if node.state in explored:
+            continue
+        explored.add(node.state)
+
+        g = cost[node.state] + 1
+        for action, state in neighbors_for_person(node.state):
+            if state in explored or cost.get(state, g + 1) <= g:
+                continue
+            f = g + estimate(state)
+            if upper is not None and f > upper:
+                continue
+            cost[state] = g
+            frontier.add(Node(state, node, action), f)
+
+    return None
+
+
+def path_to(node):
+    """
+    Returns the (movie_id, person_id) pairs leading from the root
+    of the search tree to `node`.
     """
-    # TODO
     path = []
-    explored = []
-    frontier = QueueFrontier()
-    
-    start_node = Node(source, None, None)
-    frontier.add(start_node)
-
-    while True:
-      if frontier.empty():
-        print("No solution")
-        break
-
-      node = frontier.remove()
-      if node.state == target:
-        print("We got it!!!")
-        explored.append(node.state)
-        while node.parent != None:
-          path.insert(0, (node.action, node.state))
-          node = node.parent
-        break
-      
-      explored.append(node.state)
-
-      for action, state in neighbors_for_person(node.state):
-          if not frontier.contains_state(state) and state not in explored:
-            new_node = Node(state, node, action)
-            frontier.add(new_node)
-    
+    while node.parent is not None:
+        path.append((node.action, node.state))
+        node = node.parent
+    path.reverse()
+    return path
+
+
+def join_paths(forward_node, action, backward_node):
+    """
+    Joins a node of the search from the source with a node of the search
+    from the target, given the movie linking their two people.
+    """
+    path = path_to(forward_node)
+    path.append((action, backward_node.state))
+    node = backward_node
+    while node.parent is not None:
+        path.append((node.action, node.parent.state))
+        node = node.parent
     return path
 
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -128,6 +315,12 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
+        suggestions = match_name(name, limit=5)
+        if suggestions:
+            print(f"No '{name}'. Did you mean:")
+            for candidate in suggestions:
+                print(f"ID: {candidate['person_id']}, Name: {candidate['name']}, "
+                      f"Birth: {candidate['birth']}")
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
@@ -147,11 +340,59 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def complete_name(prefix, limit=10):
+    """
+    Returns up to `limit` people whose names start with `prefix`,
+    as dictionaries of: person_id, name, birth, score.
+    """
+    matches = [(1.0, key) for key in get_name_index().complete(prefix, limit)]
+    return name_candidates(matches)[:limit]
+
+
+def match_name(query, limit=10):
+    """
+    Returns up to `limit` people whose names are most similar to `query`,
+    best first, as dictionaries of: person_id, name, birth, score.
+    """
+    return name_candidates(get_name_index().fuzzy(query, limit))[:limit]
+
+
+def get_name_index():
+    """
+    Returns the name index, building it the first time it is needed so
+    that loading the data does not pay for it.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(names)
+    return name_index
+
+
+def name_candidates(matches):
+    """
+    Expands (score, name) matches into one candidate per person.
+    """
+    candidates = []
+    for score, key in matches:
+        for person_id in sorted(names[key]):
+            person = people[person_id]
+            candidates.append({
+                "person_id": person_id,
+                "name": person["name"],
+                "birth": person["birth"],
+                "score": score
+            })
+    return candidates
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors(person_id)
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,410 @@
+"""
+Compact co-star graph for degrees.
+
+People and movies are mapped to dense integers (in sorted ID order) and the
+bipartite person <-> movie adjacency is stored as CSR arrays: the movies of
+person `p` are `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and
+likewise for the stars of a movie. The whole graph can be saved to a single
+binary snapshot and memory-mapped back in without parsing any CSV.
+"""
+
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+SNAPSHOT_NAME = "graph.bin"
+
+MAGIC = b"DEGRAPH1"
+
+# Arrays stored in a snapshot, in file order, with their typecodes
+SECTIONS = [
+    ("person_id_offsets", "q"), ("person_id_data", "B"),
+    ("person_name_offsets", "q"), ("person_name_data", "B"),
+    ("person_birth_offsets", "q"), ("person_birth_data", "B"),
+    ("movie_id_offsets", "q"), ("movie_id_data", "B"),
+    ("movie_title_offsets", "q"), ("movie_title_data", "B"),
+    ("movie_year_offsets", "q"), ("movie_year_data", "B"),
+    ("name_key_offsets", "q"), ("name_key_data", "B"),
+    ("name_people", "i"),
+    ("person_offsets", "q"), ("person_movies", "i"),
+    ("movie_offsets", "q"), ("movie_people", "i"),
+]
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 blob plus offsets.
+    Strings are only decoded when accessed.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def pack(cls, strings):
+        """
+        Builds a table from an iterable of strings.
+        """
+        offsets = array("q", [0])
+        data = bytearray()
+        for string in strings:
+            data += string.encode("utf-8")
+            offsets.append(len(data))
+        return cls(offsets, array("B", data))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class CoStarGraph():
+    """
+    Person <-> movie graph with dense integer indices and CSR adjacency.
+    """
+
+    def __init__(self, arrays, buffer=None):
+        self.person_ids = StringTable(arrays["person_id_offsets"], arrays["person_id_data"])
+        self.person_names = StringTable(arrays["person_name_offsets"], arrays["person_name_data"])
+        self.person_births = StringTable(arrays["person_birth_offsets"], arrays["person_birth_data"])
+        self.movie_ids = StringTable(arrays["movie_id_offsets"], arrays["movie_id_data"])
+        self.movie_titles = StringTable(arrays["movie_title_offsets"], arrays["movie_title_data"])
+        self.movie_years = StringTable(arrays["movie_year_offsets"], arrays["movie_year_data"])
+        self.name_keys = StringTable(arrays["name_key_offsets"], arrays["name_key_data"])
+        self.name_people = arrays["name_people"]
+        self.person_offsets = arrays["person_offsets"]
+        self.person_movies = arrays["person_movies"]
+        self.movie_offsets = arrays["movie_offsets"]
+        self.movie_people = arrays["movie_people"]
+
+        # Keep the mapped file alive for as long as the graph is in use
+        self.buffer = buffer
+
+    @property
+    def num_people(self):
+        return len(self.person_ids)
+
+    @property
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    # Building
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds the graph directly from people.csv, movies.csv and stars.csv,
+        without going through the nested dictionaries used by degrees.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            people = sorted((row[0], row[1], row[2]) for row in reader)
+
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            movies = sorted((row[0], row[1], row[2]) for row in reader)
+
+        person_index = {row[0]: i for i, row in enumerate(people)}
+        movie_index = {row[0]: i for i, row in enumerate(movies)}
+
+        # Collect edges, skipping rows that refer to unknown people or movies
+        edge_people = array("i")
+        edge_movies = array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for person_id, movie_id in reader:
+                p = person_index.get(person_id)
+                m = movie_index.get(movie_id)
+                if p is None or m is None:
+                    continue
+                edge_people.append(p)
+                edge_movies.append(m)
+
+        person_offsets, person_movies = _csr(len(people), edge_people, edge_movies)
+        movie_offsets, movie_people = _csr(len(movies), edge_movies, edge_people)
+
+        # Lower-cased names, sorted so lookups can binary search them
+        name_index = sorted((row[1].lower(), i) for i, row in enumerate(people))
+
+        arrays = {
+            "name_people": array("i", (i for _, i in name_index)),
+            "person_offsets": person_offsets,
+            "person_movies": person_movies,
+            "movie_offsets": movie_offsets,
+            "movie_people": movie_people,
+        }
+        tables = [
+            ("person_id", (row[0] for row in people)),
+            ("person_name", (row[1] for row in people)),
+            ("person_birth", (row[2] for row in people)),
+            ("movie_id", (row[0] for row in movies)),
+            ("movie_title", (row[1] for row in movies)),
+            ("movie_year", (row[2] for row in movies)),
+            ("name_key", (key for key, _ in name_index)),
+        ]
+        for prefix, strings in tables:
+            table = StringTable.pack(strings)
+            arrays[f"{prefix}_offsets"] = table.offsets
+            arrays[f"{prefix}_data"] = table.data
+        return cls(arrays)
+
+    # Snapshots
+
+    def save(self, filename):
+        """
+        Writes the graph to a binary snapshot file.
+        """
+        arrays = self._arrays()
+        header = MAGIC + struct.pack("<BQ", sys.byteorder == "little", len(SECTIONS))
+        with open(filename, "wb") as f:
+            f.write(header)
+            f.write(struct.pack(f"<{len(SECTIONS)}Q", *(
+                len(arrays[name]) for name, _ in SECTIONS
+            )))
+            _pad(f)
+            for name, typecode in SECTIONS:
+                values = arrays[name]
+                if isinstance(values, memoryview):
+                    f.write(values.tobytes())
+                else:
+                    f.write(array(typecode, values).tobytes())
+                _pad(f)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Memory-maps a snapshot written by `save`. Arrays are views into the
+        mapped file, so loading does not depend on the size of the graph.
+        """
+        with open(filename, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_size = len(MAGIC) + struct.calcsize("<BQ")
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise Exception(f"{filename} is not a degrees graph snapshot")
+        little, count = struct.unpack_from("<BQ", buffer, len(MAGIC))
+        if bool(little) != (sys.byteorder == "little"):
+            raise Exception("snapshot was written on a machine with different byte order")
+        if count != len(SECTIONS):
+            raise Exception("snapshot has an unexpected number of sections")
+        lengths = struct.unpack_from(f"<{count}Q", buffer, header_size)
+
+        view = memoryview(buffer)
+        position = _aligned(header_size + 8 * count)
+        arrays = {}
+        for (name, typecode), length in zip(SECTIONS, lengths):
+            size = length * array(typecode).itemsize
+            arrays[name] = view[position:position + size].cast(typecode)
+            position = _aligned(position + size)
+        return cls(arrays, buffer)
+
+    def _arrays(self):
+        arrays = {
+            "name_people": self.name_people,
+            "person_offsets": self.person_offsets,
+            "person_movies": self.person_movies,
+            "movie_offsets": self.movie_offsets,
+            "movie_people": self.movie_people,
+        }
+        tables = [
+            ("person_id", self.person_ids), ("person_name", self.person_names),
+            ("person_birth", self.person_births), ("movie_id", self.movie_ids),
+            ("movie_title", self.movie_titles), ("movie_year", self.movie_years),
+            ("name_key", self.name_keys),
+        ]
+        for prefix, table in tables:
+            arrays[f"{prefix}_offsets"] = table.offsets
+            arrays[f"{prefix}_data"] = table.data
+        return arrays
+
+    # Lookups
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index for a person_id, or None if unknown.
+        """
+        return _find(self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index for a movie_id, or None if unknown.
+        """
+        return _find(self.movie_ids, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns the set of person_ids whose lower-cased name is `name`.
+        """
+        lo = bisect_left(self.name_keys, name)
+        hi = bisect_right(self.name_keys, name, lo)
+        return {self.person_ids[self.name_people[i]] for i in range(lo, hi)}
+
+    def movies_of(self, p):
+        """
+        Returns the movie indices for person index `p`.
+        """
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """
+        Returns the person indices for movie index `m`.
+        """
+        return self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def neighbor_indices(self, p):
+        """
+        Yields (movie index, person index) pairs for people who starred
+        with person index `p`.
+        """
+        for m in self.movies_of(p):
+            for q in self.stars_of(m):
+                yield m, q
+
+    def neighbors(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people who starred
+        with a given person.
+        """
+        p = self.person_index(person_id)
+        if p is None:
+            raise KeyError(person_id)
+        return {
+            (self.movie_ids[m], self.person_ids[q])
+            for m, q in self.neighbor_indices(p)
+        }
+
+
+class PeopleView(Mapping):
+    """
+    Read-only `people` dictionary backed by a CoStarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        p = self.graph.person_index(person_id)
+        if p is None:
+            raise KeyError(person_id)
+        return {
+            "name": self.graph.person_names[p],
+            "birth": self.graph.person_births[p],
+            "movies": {self.graph.movie_ids[m] for m in self.graph.movies_of(p)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return self.graph.num_people
+
+
+class MoviesView(Mapping):
+    """
+    Read-only `movies` dictionary backed by a CoStarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        m = self.graph.movie_index(movie_id)
+        if m is None:
+            raise KeyError(movie_id)
+        return {
+            "title": self.graph.movie_titles[m],
+            "year": self.graph.movie_years[m],
+            "stars": {self.graph.person_ids[p] for p in self.graph.stars_of(m)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return self.graph.num_movies
+
+
+class NamesView(Mapping):
+    """
+    Read-only `names` dictionary backed by a CoStarGraph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        person_ids = self.graph.people_named(name)
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        for key in self.graph.name_keys:
+            if key != previous:
+                yield key
+            previous = key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _csr(count, sources, targets):
+    """
+    Groups `targets` by `sources` into (offsets, values) arrays.
+    """
+    offsets = array("q", bytes(8 * (count + 1)))
+    for s in sources:
+        offsets[s + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    values = array("i", bytes(4 * len(targets)))
+    cursor = array("q", offsets[:-1])
+    for s, t in zip(sources, targets):
+        values[cursor[s]] = t
+        cursor[s] += 1
+    return offsets, values
+
+
+def _find(table, key):
+    i = bisect_left(table, key)
+    if i < len(table) and table[i] == key:
+        return i
+    return None
+
+
+def _aligned(position):
+    return (position + 7) & ~7
+
+
+def _pad(f):
+    f.write(bytes(_aligned(f.tell()) - f.tell()))
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python graph.py directory")
+    directory = sys.argv[1]
+
+    print("Building graph...")
+    graph = CoStarGraph.from_csv(directory)
+    filename = os.path.join(directory, SNAPSHOT_NAME)
+    graph.save(filename)
+    print(f"Saved {graph.num_people} people and {graph.num_movies} movies to {filename}.")
+
+
+if __name__ == "__main__":
+    main()
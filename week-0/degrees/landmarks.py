@@ -0,0 +1,268 @@
+"""
+Landmark distance index for degrees.
+
+Stores breadth-first distances from a few hundred well-connected people
+(the landmarks) to everybody else, plus a connected-component label for
+every person. People are numbered in sorted person_id order, the same
+order used by graph.py.
+
+For any landmark L, |d(L, a) - d(L, b)| <= d(a, b) <= d(L, a) + d(L, b),
+which gives instant bounds on the separation of two people and an
+admissible, consistent heuristic for A* search.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+LANDMARKS_NAME = "landmarks.bin"
+
+MAGIC = b"DELMARK1"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+
+    def __init__(self, components, landmarks, distances, index_of=None, buffer=None):
+        self.components = components
+        self.landmarks = landmarks
+        self.distances = distances
+        self.index_of = index_of
+        self.buffer = buffer
+
+    @property
+    def num_people(self):
+        return len(self.components)
+
+    # Building
+
+    @classmethod
+    def build(cls, num_people, neighbors, num_landmarks=200, degree=None):
+        """
+        Builds the index for people numbered 0 .. num_people - 1, where
+        `neighbors(p)` yields the numbers of the people p starred with.
+        Landmarks are the people with the highest `degree(p)`
+        (by default, their number of co-star entries).
+        """
+        if degree is None:
+            def degree(p):
+                return sum(1 for _ in neighbors(p))
+
+        # Label connected components
+        components = array("i", [-1]) * num_people
+        label = 0
+        for start in range(num_people):
+            if components[start] != -1:
+                continue
+            components[start] = label
+            layer = [start]
+            while layer:
+                next_layer = []
+                for p in layer:
+                    for q in neighbors(p):
+                        if components[q] == -1:
+                            components[q] = label
+                            next_layer.append(q)
+                layer = next_layer
+            label += 1
+
+        # Choose landmarks and record distances from each of them
+        ranked = sorted(range(num_people), key=degree, reverse=True)
+        landmarks = array("i", ranked[:num_landmarks])
+        distances = array("B")
+        for landmark in landmarks:
+            distances.extend(cls._distances_from(num_people, neighbors, landmark))
+        return cls(components, landmarks, distances)
+
+    @staticmethod
+    def _distances_from(num_people, neighbors, source):
+        distances = array("B", [UNREACHABLE]) * num_people
+        distances[source] = 0
+        layer = [source]
+        depth = 0
+        while layer and depth + 1 < UNREACHABLE:
+            depth += 1
+            next_layer = []
+            for p in layer:
+                for q in neighbors(p):
+                    if distances[q] == UNREACHABLE:
+                        distances[q] = depth
+                        next_layer.append(q)
+            layer = next_layer
+        return distances
+
+    # Persistence
+
+    def save(self, filename):
+        """
+        Writes the index to a binary file.
+        """
+        with open(filename, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<BQQ", sys.byteorder == "little",
+                                self.num_people, len(self.landmarks)))
+            f.write(array("i", self.components).tobytes())
+            f.write(array("i", self.landmarks).tobytes())
+            f.write(array("B", self.distances).tobytes())
+
+    @classmethod
+    def load(cls, filename, index_of=None):
+        """
+        Memory-maps an index written by `save`. `index_of` maps a
+        person_id to its number and is needed by the person_id methods.
+        """
+        with open(filename, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise Exception(f"{filename} is not a landmark index")
+        little, num_people, num_landmarks = struct.unpack_from("<BQQ", buffer, len(MAGIC))
+        if bool(little) != (sys.byteorder == "little"):
+            raise Exception("index was written on a machine with different byte order")
+
+        view = memoryview(buffer)
+        position = len(MAGIC) + struct.calcsize("<BQQ")
+        components = view[position:position + 4 * num_people].cast("i")
+        position += 4 * num_people
+        landmarks = view[position:position + 4 * num_landmarks].cast("i")
+        position += 4 * num_landmarks
+        distances = view[position:position + num_people * num_landmarks]
+        return cls(components, landmarks, distances, index_of, buffer)
+
+    # Queries by person number
+
+    def connected_indices(self, a, b):
+        return self.components[a] == self.components[b]
+
+    def bounds_indices(self, a, b):
+        """
+        Returns (lower, upper) bounds on the separation of people a and b,
+        or None if they are not connected. Upper is None if no landmark
+        reaches both of them.
+        """
+        if not self.connected_indices(a, b):
+            return None
+        lower = 0
+        upper = None
+        n = self.num_people
+        for i in range(len(self.landmarks)):
+            da = self.distances[i * n + a]
+            db = self.distances[i * n + b]
+            if da == UNREACHABLE or db == UNREACHABLE:
+                continue
+            lower = max(lower, abs(da - db))
+            if upper is None or da + db < upper:
+                upper = da + db
+        return lower, upper
+
+    def lower_bound_indices(self, a, b):
+        """
+        Returns a lower bound on the separation of connected people a and b.
+        """
+        lower = 0
+        n = self.num_people
+        for i in range(len(self.landmarks)):
+            da = self.distances[i * n + a]
+            db = self.distances[i * n + b]
+            if da != UNREACHABLE and db != UNREACHABLE and abs(da - db) > lower:
+                lower = abs(da - db)
+        return lower
+
+    def heuristic_indices(self, b):
+        """
+        Returns a function giving a lower bound on the separation of any
+        connected person number from person b. The distances of b are
+        looked up once, and landmarks that cannot reach b are skipped.
+        """
+        n = self.num_people
+        columns = []
+        for i in range(len(self.landmarks)):
+            db = self.distances[i * n + b]
+            if db != UNREACHABLE:
+                columns.append((i * n, db))
+        distances = self.distances
+
+        def estimate(a):
+            lower = 0
+            for offset, db in columns:
+                da = distances[offset + a]
+                if da != UNREACHABLE and abs(da - db) > lower:
+                    lower = abs(da - db)
+            return lower
+
+        return estimate
+
+    # Queries by person_id
+
+    def connected(self, source, target):
+        """
+        Returns True if the two people are linked by any chain of movies.
+        """
+        return self.connected_indices(self.index_of(source), self.index_of(target))
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation, or None
+        if the two people are not connected.
+        """
+        return self.bounds_indices(self.index_of(source), self.index_of(target))
+
+    def lower_bound(self, source, target):
+        return self.lower_bound_indices(self.index_of(source), self.index_of(target))
+
+    def heuristic(self, target):
+        """
+        Returns a function giving a lower bound on the separation of a
+        person_id from the target.
+        """
+        estimate = self.heuristic_indices(self.index_of(target))
+        index_of = self.index_of
+        return lambda person_id: estimate(index_of(person_id))
+
+
+def main():
+    if not 2 <= len(sys.argv) <= 3:
+        sys.exit("Usage: python landmarks.py directory [landmarks]")
+    directory = sys.argv[1]
+    num_landmarks = int(sys.argv[2]) if len(sys.argv) == 3 else 200
+
+    import degrees
+
+    # Drop any stale index so that loading the data does not pick it up
+    filename = os.path.join(directory, LANDMARKS_NAME)
+    if os.path.exists(filename):
+        os.remove(filename)
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    if degrees.graph is not None:
+        graph = degrees.graph
+
+        def neighbors(p):
+            for _, q in graph.neighbor_indices(p):
+                yield q
+
+        num_people = graph.num_people
+    else:
+        person_ids = sorted(degrees.people)
+        index = {person_id: i for i, person_id in enumerate(person_ids)}
+
+        def neighbors(p):
+            for _, person_id in degrees.neighbors_for_person(person_ids[p]):
+                yield index[person_id]
+
+        num_people = len(person_ids)
+
+    print("Building landmark index...")
+    landmarks = LandmarkIndex.build(num_people, neighbors, num_landmarks)
+    landmarks.save(filename)
+    print(f"Saved {len(landmarks.landmarks)} landmarks to {filename}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Parallel CSV loader for degrees.
+
+Each of people.csv, movies.csv and stars.csv is cut into blocks of about
+BLOCK_SIZE bytes that end on a row boundary, and the blocks are parsed in
+worker processes with csv.reader, using positional column access instead
+of building a dictionary per row. This process adds each block's rows to
+the dictionaries as soon as it arrives, while the workers parse the next
+few blocks; only that window of blocks is held in memory at once. IDs from stars.csv are replaced by the matching key of `people`
+or `movies`, so each ID string is stored once however many rows refer to
+it. The garbage collector is paused while loading, since none of the
+millions of new containers can form cycles.
+"""
+
+import csv
+import gc
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def read_blocks(filename, size=BLOCK_SIZE):
+    """
+    Yields the bytes of a CSV file after its header, in blocks of about
+    `size` bytes that each end at the end of a row. A newline inside a
+    quoted field is not a row boundary: it follows an odd number of quotes.
+    """
+    with open(filename, "rb") as f:
+        f.readline()
+        carry = b""
+        while True:
+            data = f.read(size)
+            if not data:
+                if carry:
+                    yield carry
+                return
+            block = carry + data
+            quotes = block.count(b'"')
+            cut = block.rfind(b"\n")
+            while cut != -1 and (quotes - block.count(b'"', cut)) % 2:
+                cut = block.rfind(b"\n", 0, cut)
+            if cut == -1:
+                carry = block
+                continue
+            yield block[:cut + 1]
+            carry = block[cut + 1:]
+
+
+def parse_block(data):
+    """
+    Returns the rows of a block of CSV bytes as lists, skipping blank
+    lines as csv.DictReader does.
+    """
+    with PausedGC():
+        reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+        return [row for row in reader if row]
+
+
+def read_rows(executor, filename, window, progress=False):
+    """
+    Yields the rows of a CSV file in file order, optionally reporting
+    progress after each block. At most `window` blocks are submitted to
+    the executor ahead of the rows being yielded.
+    """
+    count = 0
+    start = time.perf_counter()
+    blocks = read_blocks(filename)
+    pending = deque(
+        executor.submit(parse_block, block)
+        for block in itertools.islice(blocks, window)
+    )
+    while pending:
+        rows = pending.popleft().result()
+
+        # Keep the workers busy while these rows are stored
+        for block in itertools.islice(blocks, 1):
+            pending.append(executor.submit(parse_block, block))
+        yield from rows
+        count += len(rows)
+        if progress:
+            report(filename, count, start)
+
+
+def report(filename, count, start):
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"{filename}: {count:,} rows ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+class PausedGC():
+    """
+    Context manager that disables the garbage collector, if enabled.
+    """
+
+    def __enter__(self):
+        self.enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, *args):
+        if self.enabled:
+            gc.enable()
+
+
+class InlineExecutor():
+    """
+    Stand-in for ProcessPoolExecutor that runs each call immediately.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def load(directory, names, people, movies, workers=None, progress=False):
+    """
+    Loads the three CSV files of `directory` into the `names`, `people`
+    and `movies` dictionaries, in the format used by degrees.
+    With a single worker the files are read in this process.
+    """
+    if workers is None:
+        workers = min(3, os.cpu_count() or 1)
+
+    # Daemonic processes, such as multiprocessing.Pool workers, cannot
+    # start worker processes of their own
+    if multiprocessing.current_process().daemon:
+        workers = 1
+    executor = ProcessPoolExecutor(workers) if workers > 1 else InlineExecutor()
+
+    # Blocks parsed ahead of the one being stored, so every worker has one
+    # queued behind the one it is parsing
+    window = 2 * workers if workers > 1 else 1
+
+    filenames = [f"{directory}/{name}.csv" for name in ("people", "movies", "stars")]
+    with executor, PausedGC():
+        people_rows, movie_rows, star_rows = [
+            read_rows(executor, filename, window, progress)
+            for filename in filenames
+        ]
+
+        # Load people, remembering each canonical ID with its entry
+        person_entries = {}
+        for person_id, name, birth in people_rows:
+            person = {
+                "name": name,
+                "birth": birth,
+                "movies": set()
+            }
+            people[person_id] = person
+            person_entries[person_id] = (person_id, person)
+            key = name.lower()
+            if key not in names:
+                names[key] = {person_id}
+            else:
+                names[key].add(person_id)
+
+        # Load movies
+        movie_entries = {}
+        for movie_id, title, year in movie_rows:
+            movie = {
+                "title": title,
+                "year": year,
+                "stars": set()
+            }
+            movies[movie_id] = movie
+            movie_entries[movie_id] = (movie_id, movie)
+
+        # Load stars
+        for person_id, movie_id in star_rows:
+            person_entry = person_entries.get(person_id)
+            movie_entry = movie_entries.get(movie_id)
+            if person_entry is None or movie_entry is None:
+                continue
+            person_id, person = person_entry
+            movie_id, movie = movie_entry
+            person["movies"].add(movie_id)
+            movie["stars"].add(person_id)
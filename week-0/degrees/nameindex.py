@@ -0,0 +1,93 @@
+"""
+Name lookup index for degrees.
+
+Keeps the distinct lower-cased names sorted, so autocompletion is a binary
+search for the prefix, and an inverted index from character trigrams to
+names for fuzzy matching.
+"""
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+
+# Trigrams in more names than this are only used to gather candidates
+# when no rarer query trigram is known
+MAX_POSTINGS = 10000
+
+# Most candidates to score exactly, keeping those sharing the most trigrams
+MAX_CANDIDATES = 2000
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of `text`, padded so that the
+    start and end of the string form trigrams of their own.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.postings = {}
+        for i, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                if gram not in self.postings:
+                    self.postings[gram] = array("i")
+                self.postings[gram].append(i)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with `prefix`, in sorted order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(matches) < limit and self.keys[i].startswith(prefix):
+            matches.append(self.keys[i])
+            i += 1
+        return matches
+
+    def fuzzy(self, query, limit=10, min_score=0.4):
+        """
+        Returns up to `limit` (score, name) pairs, best first, for names
+        whose trigram similarity (Dice coefficient) to `query` is at
+        least `min_score`.
+        """
+        query = query.lower()
+        grams = trigrams(query)
+
+        # A name scoring at least min_score must share `needed` trigrams
+        # with the query, so it is enough to gather candidates from all
+        # but the `needed - 1` most common query trigrams. Trigrams common
+        # to very many names are skipped once rarer ones gave candidates.
+        needed = max(1, math.ceil(min_score * len(grams) / 2))
+        lists = sorted(
+            (self.postings[gram] for gram in grams if gram in self.postings),
+            key=len
+        )
+        shared = {}
+        for postings in lists[:len(grams) - needed + 1]:
+            if len(postings) > MAX_POSTINGS and shared:
+                break
+            for i in postings:
+                shared[i] = shared.get(i, 0) + 1
+        candidates = shared
+        if len(shared) > MAX_CANDIDATES:
+            candidates = heapq.nlargest(MAX_CANDIDATES, shared, key=shared.get)
+
+        scored = []
+        for i in candidates:
+            key = self.keys[i]
+            key_grams = trigrams(key)
+            score = 2 * len(grams & key_grams) / (len(grams) + len(key_grams))
+            if score >= min_score:
+                scored.append((score, key))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
@@ -1,3 +1,7 @@
+import heapq
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +40,71 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a companion count of the
+    states it holds so that `contains_state` does not scan every node.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        return self._discard(self.frontier.pop())
+
+    def _discard(self, node):
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        return self._discard(self.frontier.popleft())
+
+
+class PriorityFrontier(DequeStackFrontier):
+    """
+    Frontier that always removes the node with the lowest priority.
+    `priority` is called on each node as it is added, unless a priority
+    is given explicitly; ties are removed in insertion order.
+    """
+
+    def __init__(self, priority=None):
+        super().__init__()
+        self.frontier = []
+        self.priority = priority
+        self.counter = 0
+
+    def add(self, node, priority=None):
+        if priority is None:
+            priority = self.priority(node)
+        heapq.heappush(self.frontier, (priority, self.counter, node))
+        self.counter += 1
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        return self._discard(heapq.heappop(self.frontier)[2])
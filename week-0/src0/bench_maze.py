@@ -0,0 +1,98 @@
+"""
+Benchmark the maze solvers on large random mazes.
+
+Generates a maze with a randomized depth-first carve (then knocks out some
+extra walls so there is more than one route), writes it in the usual text
+format and reports, for every strategy, the states explored, solution
+length, wall-clock time and peak memory allocated while solving.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from maze import Maze, SOLVERS
+
+
+def generate(height, width, loops=0.05, seed=0):
+    """
+    Returns the lines of a random maze of at most `height` x `width`
+    characters, with start A in the top left and goal B in the bottom right.
+    """
+    rng = random.Random(seed)
+    rows = (height - 1) // 2
+    cols = (width - 1) // 2
+    grid = [["#"] * (2 * cols + 1) for _ in range(2 * rows + 1)]
+
+    # Carve a perfect maze, keeping an explicit stack to avoid recursion
+    grid[1][1] = " "
+    stack = [(0, 0)]
+    visited = {(0, 0)}
+    while stack:
+        r, c = stack[-1]
+        options = [
+            (r + dr, c + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+            if 0 <= r + dr < rows and 0 <= c + dc < cols and (r + dr, c + dc) not in visited
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = rng.choice(options)
+        grid[r + nr + 1][c + nc + 1] = " "
+        grid[2 * nr + 1][2 * nc + 1] = " "
+        visited.add((nr, nc))
+        stack.append((nr, nc))
+
+    # Remove some interior walls to create loops
+    for _ in range(int(loops * rows * cols)):
+        i = rng.randrange(1, 2 * rows)
+        j = rng.randrange(1, 2 * cols)
+        if (i + j) % 2 == 1:
+            grid[i][j] = " "
+
+    grid[1][1] = "A"
+    grid[2 * rows - 1][2 * cols - 1] = "B"
+    return ["".join(row) for row in grid]
+
+
+def measure(maze, strategy):
+    """
+    Solves `maze` with `strategy`, returning (states explored, solution
+    length, seconds, peak bytes). Time is measured without tracing memory.
+    """
+    start = time.perf_counter()
+    maze.solve(strategy)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    maze.solve(strategy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return maze.num_explored, len(maze.solution[0]), elapsed, peak
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python bench_maze.py [size] [seed]")
+    size = int(sys.argv[1]) if len(sys.argv) >= 2 else 401
+    seed = int(sys.argv[2]) if len(sys.argv) == 3 else 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "maze.txt")
+        with open(filename, "w") as f:
+            f.write("\n".join(generate(size, size, seed=seed)))
+        maze = Maze(filename)
+
+    print(f"Maze: {maze.height} x {maze.width}")
+    print(f"{'strategy':<10}{'explored':>12}{'length':>10}{'time (s)':>12}{'peak (MB)':>12}")
+    for strategy in SOLVERS:
+        explored, length, elapsed, peak = measure(maze, strategy)
+        print(f"{strategy:<10}{explored:>12,}{length:>10,}{elapsed:>12.3f}{peak / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import heapq
 import sys
+from collections import deque
 
 class Node():
     def __init__(self, state, parent, action):
@@ -39,92 +41,248 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a companion count of the
+    states it holds so that `contains_state` does not scan every node.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        return self._discard(self.frontier.pop())
+
+    def _discard(self, node):
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        return self._discard(self.frontier.popleft())
+
+
+class PriorityFrontier(DequeStackFrontier):
+    """
+    Frontier that always removes the node with the lowest priority.
+    `priority` is called on each node as it is added, unless a priority
+    is given explicitly; ties are removed in insertion order.
+    """
+
+    def __init__(self, priority=None):
+        super().__init__()
+        self.frontier = []
+        self.priority = priority
+        self.counter = 0
+
+    def add(self, node, priority=None):
+        if priority is None:
+            priority = self.priority(node)
+        heapq.heappush(self.frontier, (priority, self.counter, node))
+        self.counter += 1
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        return self._discard(heapq.heappop(self.frontier)[2])
+
+class BitGrid():
+    """
+    Open cells of a maze packed one bit per cell, row by row, plus one
+    precomputed bit mask per direction marking the cells from which a
+    move in that direction stays on an open cell.
+    """
+
+    # Characters that are not walls in a maze file
+    OPEN = " AB"
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.stride = (width + 7) // 8
+        self.open = bytearray(height * self.stride)
+        self.masks = {}
+
+    def set_row(self, i, line):
+        """Marks the open cells of row `i` from a line of a maze file."""
+        bits = line.translate(WALL_DIGITS)
+        if not set(bits) <= {"0", "1"}:
+            bits = "".join("0" if char in self.OPEN else "1" for char in line)
+        walls = int(bits[::-1], 2) if bits else 0
+        self.set_row_bits(i, ~walls & ((1 << self.width) - 1))
+
+    def row_bits(self, i, grid=None):
+        """Returns row `i` of `grid` (by default the open cells) as an int."""
+        grid = self.open if grid is None else grid
+        return int.from_bytes(grid[i * self.stride:(i + 1) * self.stride], "little")
+
+    def set_row_bits(self, i, bits, grid=None):
+        grid = self.open if grid is None else grid
+        grid[i * self.stride:(i + 1) * self.stride] = bits.to_bytes(self.stride, "little")
+
+    def build_masks(self):
+        """Computes the direction masks once every row has been set."""
+        self.masks = {action: bytearray(len(self.open)) for action in DIRECTIONS}
+        previous = 0
+        current = self.row_bits(0) if self.height else 0
+        for i in range(self.height):
+            following = self.row_bits(i + 1) if i + 1 < self.height else 0
+            self.set_row_bits(i, current & previous, self.masks["up"])
+            self.set_row_bits(i, current & following, self.masks["down"])
+            self.set_row_bits(i, current & (current << 1), self.masks["left"])
+            self.set_row_bits(i, current & (current >> 1), self.masks["right"])
+            previous, current = current, following
+
+    def is_open(self, row, col):
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return False
+        return self.open[row * self.stride + (col >> 3)] >> (col & 7) & 1 == 1
+
+    def can_move(self, row, col, action):
+        return self.masks[action][row * self.stride + (col >> 3)] >> (col & 7) & 1 == 1
+
+
+class WallRows():
+    """Read-only `walls[i][j]` view of a BitGrid."""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __len__(self):
+        return self.grid.height
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.grid.height:
+            raise IndexError("maze row out of range")
+        return [not self.grid.is_open(i, j) for j in range(self.grid.width)]
+
+
+class ReachedCells():
+    """Set-like view of the cells reached by `Maze.solve_compact`."""
+
+    def __init__(self, came_from, width):
+        self.came_from = came_from
+        self.width = width
+
+    def __contains__(self, cell):
+        row, col = cell
+        return 0 <= col < self.width and self.came_from[row * self.width + col] != 0
+
+    def __iter__(self):
+        reached = self.came_from.translate(NONZERO)
+        k = reached.find(1)
+        while k != -1:
+            yield divmod(k, self.width)
+            k = reached.find(1, k + 1)
+
+
 class Maze():
 
     def __init__(self, filename):
 
-        # Read file and set height and width of maze
+        # Determine height and width of maze, and find start and goal
+        self.height = 0
+        self.width = 0
+        starts = []
+        goals = []
         with open(filename) as f:
-            contents = f.read()
+            for i, line in enumerate(f):
+                line = line.rstrip("\r\n")
+                self.height += 1
+                self.width = max(self.width, len(line))
+                starts.extend((i, j) for j in find_all(line, "A"))
+                goals.extend((i, j) for j in find_all(line, "B"))
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        if len(starts) != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if len(goals) != 1:
             raise Exception("maze must have exactly one goal")
+        self.start = starts[0]
+        self.goal = goals[0]
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        # Keep track of walls, one bit per cell
+        self.grid = BitGrid(self.height, self.width)
+        with open(filename) as f:
+            for i, line in enumerate(f):
+                self.grid.set_row(i, line.rstrip("\r\n"))
+        self.grid.build_masks()
+        self.walls = WallRows(self.grid)
 
         self.solution = None
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = set(self.solution[1]) if self.solution is not None else set()
         print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
+        for i in range(self.height):
+            open_cells = self.grid.row_bits(i)
+            line = []
+            for j in range(self.width):
+                if not open_cells >> j & 1:
+                    line.append("█")
                 elif (i, j) == self.start:
-                    print("A", end="")
+                    line.append("A")
                 elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
+                    line.append("B")
+                elif (i, j) in solution:
+                    line.append("*")
                 else:
-                    print(" ", end="")
-            print()
+                    line.append(" ")
+            print("".join(line))
         print()
 
 
     def neighbors(self, state):
         row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
-
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        for action, (dr, dc) in DIRECTIONS.items():
+            if self.grid.can_move(row, col, action):
+                result.append((action, (row + dr, col + dc)))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists, using one of the
+        strategies in SOLVERS (depth-first search by default).
+        """
+        if strategy not in SOLVERS:
+            raise Exception(f"unknown strategy: {strategy}")
+        SOLVERS[strategy](self)
+
+
+    def solve_uninformed(self, frontier):
+        """Finds a solution by searching in the order given by `frontier`."""
 
         # Keep track of number of states explored
         self.num_explored = 0
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
         frontier.add(start)
 
         # Initialize an empty explored set
@@ -143,15 +301,7 @@ class Maze():
 
             # If node is the goal, then we have a solution
             if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+                self.solution = self.path_to(node)
                 return
 
             # Mark node as explored
@@ -164,66 +314,351 @@ class Maze():
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+    def solve_best_first(self, use_cost):
+        """
+        Finds a solution by always expanding the node with the lowest
+        estimate: the Manhattan distance to the goal (greedy best-first),
+        plus the cost so far if `use_cost` (A*).
+        """
+        self.num_explored = 0
+        self.explored = set()
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+        cost = {self.start: 0}
+        frontier = PriorityFrontier()
+        frontier.add(Node(state=self.start, parent=None, action=None), self.distance(self.start))
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+        while not frontier.empty():
+            node = frontier.remove()
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+            # A state may be queued more than once when A* finds a cheaper path
+            if node.state in self.explored:
+                continue
+            self.num_explored += 1
+
+            if node.state == self.goal:
+                self.solution = self.path_to(node)
+                return
+
+            self.explored.add(node.state)
 
-                # Empty cell
+            g = cost[node.state] + 1
+            for action, state in self.neighbors(node.state):
+                if state in self.explored:
+                    continue
+                if use_cost:
+                    if state in cost and cost[state] <= g:
+                        continue
+                    priority = g + self.distance(state)
                 else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+                    if state in cost:
+                        continue
+                    priority = self.distance(state)
+                cost[state] = g
+                frontier.add(Node(state=state, parent=node, action=action), priority)
+
+        raise Exception("no solution")
+
+
+    def solve_jump(self):
+        """
+        Finds a shortest solution with A* over jump points: from each point
+        the search runs straight in every direction (except back) and only
+        stops at the goal or at cells where it could turn, so corridors are
+        crossed in a single step.
+        """
+        self.num_explored = 0
+        self.explored = set()
+
+        cost = {self.start: 0}
+        frontier = PriorityFrontier()
+        frontier.add(Node(state=self.start, parent=None, action=None), self.distance(self.start))
+
+        while not frontier.empty():
+            node = frontier.remove()
+            if node.state in self.explored:
+                continue
+            self.num_explored += 1
+
+            if node.state == self.goal:
+                self.solution = self.expand_jumps(node)
+                return
+
+            self.explored.add(node.state)
+
+            for action in DIRECTIONS:
+                if node.action is not None and action == OPPOSITE[node.action]:
+                    continue
+                jump = self.jump(node.state, action)
+                if jump is None:
+                    continue
+                state, length = jump
+                g = cost[node.state] + length
+                if state in self.explored or (state in cost and cost[state] <= g):
+                    continue
+                cost[state] = g
+                frontier.add(Node(state=state, parent=node, action=action), g + self.distance(state))
+
+        raise Exception("no solution")
+
+
+    def jump(self, state, action):
+        """
+        Moves from `state` in direction `action` until reaching the goal, a
+        cell with an open side turning off the line, or a dead end.
+        Returns (cell, steps taken), or None if the first step is blocked.
+        """
+        dr, dc = DIRECTIONS[action]
+        turns = TURNS[action]
+        row, col = state
+        steps = 0
+        while True:
+            if not self.grid.can_move(row, col, action):
+                return ((row, col), steps) if steps else None
+            row, col = row + dr, col + dc
+            steps += 1
+            if (row, col) == self.goal:
+                return (row, col), steps
+            for turn in turns:
+                if self.grid.can_move(row, col, turn):
+                    return (row, col), steps
+
+
+    def expand_jumps(self, node):
+        """Returns the cell-by-cell (actions, cells) for a path of jumps."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            dr, dc = DIRECTIONS[node.action]
+            row, col = node.state
+            while (row, col) != node.parent.state:
+                actions.append(node.action)
+                cells.append((row, col))
+                row, col = row - dr, col - dc
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+
+    def solve_compact(self):
+        """
+        Breadth-first search over flat cell numbers, remembering only the
+        direction each cell was reached from (one byte per cell), so that
+        very large mazes can be solved without a node object per cell.
+        """
+        actions = list(DIRECTIONS)
+        width = self.width
+        offsets = [dr * width + dc for dr, dc in DIRECTIONS.values()]
+        came_from = bytearray(self.height * width)
+
+        start = self.start[0] * width + self.start[1]
+        goal = self.goal[0] * width + self.goal[1]
+        came_from[start] = len(actions) + 1
+        self.num_explored = 0
+        queue = deque([start])
+
+        while queue:
+            cell = queue.popleft()
+            self.num_explored += 1
+            if cell == goal:
+                break
+            row, col = divmod(cell, width)
+            for k, action in enumerate(actions):
+                if self.grid.can_move(row, col, action):
+                    neighbor = cell + offsets[k]
+                    if not came_from[neighbor]:
+                        came_from[neighbor] = k + 1
+                        queue.append(neighbor)
+        else:
+            raise Exception("no solution")
+
+        # Walk back from the goal along the recorded directions
+        path_actions = []
+        cells = []
+        cell = goal
+        while cell != start:
+            k = came_from[cell] - 1
+            path_actions.append(actions[k])
+            cells.append(divmod(cell, width))
+            cell -= offsets[k]
+        path_actions.reverse()
+        cells.reverse()
+        self.solution = (path_actions, cells)
+        self.explored = ReachedCells(came_from, width)
+
+
+    def path_to(self, node):
+        """Returns the (actions, cells) leading from the start to `node`."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(node.state)
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+
+    def distance(self, state):
+        """Returns the Manhattan distance from `state` to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False):
+        from PIL import Image
+        explored, solution = self.image_layers(show_solution, show_explored)
+        pixels = self.render(0, 0, self.height, self.width, explored, solution)
+        Image.fromarray(pixels).save(filename)
+
+
+    def output_tiles(self, prefix, tile_cells=256, show_solution=True, show_explored=False):
+        """
+        Writes the image as tiles of `tile_cells` x `tile_cells` cells named
+        prefix_{tile row}_{tile column}.png, one at a time, for mazes too
+        large to render as a single image. Returns the filenames.
+        """
+        from PIL import Image
+        explored, solution = self.image_layers(show_solution, show_explored)
+        filenames = []
+        for top in range(0, self.height, tile_cells):
+            for left in range(0, self.width, tile_cells):
+                height = min(tile_cells, self.height - top)
+                width = min(tile_cells, self.width - left)
+                pixels = self.render(top, left, height, width, explored, solution)
+                filename = f"{prefix}_{top // tile_cells}_{left // tile_cells}.png"
+                Image.fromarray(pixels).save(filename)
+                filenames.append(filename)
+        return filenames
+
+
+    def image_layers(self, show_solution, show_explored):
+        """
+        Returns the (explored, solution) cells to highlight, each as an
+        array of (row, col) pairs, a boolean array over the whole maze,
+        or None.
+        """
+        import numpy as np
+        if self.solution is None:
+            return None, None
+
+        solution = np.array(self.solution[1], dtype=np.int64).reshape(-1, 2) if show_solution else None
+        explored = None
+        if show_explored and isinstance(self.explored, ReachedCells):
+            came_from = np.frombuffer(self.explored.came_from, dtype=np.uint8)
+            explored = came_from.reshape(self.height, self.width) != 0
+        elif show_explored:
+            explored = np.array(list(self.explored), dtype=np.int64).reshape(-1, 2)
+        return explored, solution
+
+
+    def render(self, top, left, height, width, explored=None, solution=None,
+               cell_size=50, cell_border=2):
+        """
+        Returns an RGB array of the `height` x `width` cells starting at
+        (top, left). Cells are coloured as a small array of palette indices,
+        scaled up by repetition, and cell borders are blanked in one step.
+        """
+        import numpy as np
+
+        # Unpack only the bytes covering the requested columns
+        first = left // 8
+        last = (left + width + 7) // 8
+        packed = np.frombuffer(self.grid.open, dtype=np.uint8).reshape(self.height, self.grid.stride)
+        bits = np.unpackbits(packed[top:top + height, first:last], axis=1, bitorder="little")
+        open_cells = bits[:, left - 8 * first:left - 8 * first + width].astype(bool)
+
+        index = np.where(open_cells, EMPTY, WALL).astype(np.uint8)
+        for cells, color in [(explored, EXPLORED), (solution, SOLUTION)]:
+            if cells is None:
+                continue
+            if cells.dtype == bool:
+                index[cells[top:top + height, left:left + width] & open_cells] = color
+            else:
+                rows = cells[:, 0] - top
+                cols = cells[:, 1] - left
+                inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+                index[rows[inside], cols[inside]] = color
+        for (i, j), color in [(self.start, START), (self.goal, GOAL)]:
+            if top <= i < top + height and left <= j < left + width:
+                index[i - top, j - left] = color
+
+        # Scale each cell up, then blank the border pixels of every cell
+        index = np.repeat(np.repeat(index, cell_size, axis=0), cell_size, axis=1)
+        inner = np.zeros(cell_size, dtype=bool)
+        inner[cell_border:cell_size - cell_border + 1] = True
+        index[~np.tile(inner, height), :] = BORDER
+        index[:, ~np.tile(inner, width)] = BORDER
+        return np.array(PALETTE, dtype=np.uint8)[index]
+
+
+# Palette indices and colours used when rendering images
+BORDER, WALL, START, GOAL, SOLUTION, EXPLORED, EMPTY = range(7)
+PALETTE = [
+    (0, 0, 0),
+    (40, 40, 40),
+    (255, 0, 0),
+    (0, 171, 28),
+    (220, 235, 113),
+    (212, 97, 85),
+    (237, 240, 252)
+]
+
+# Row and column offsets for each action
+DIRECTIONS = {
+    "up": (-1, 0),
+    "down": (1, 0),
+    "left": (0, -1),
+    "right": (0, 1)
+}
+
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+TURNS = {
+    "up": ("left", "right"),
+    "down": ("left", "right"),
+    "left": ("up", "down"),
+    "right": ("up", "down")
+}
+
+# Translation of any nonzero byte to 1
+NONZERO = bytes([0] + [1] * 255)
+
+WALL_DIGITS = str.maketrans({" ": "0", "A": "0", "B": "0", "#": "1", "█": "1"})
+
+SOLVERS = {
+    "dfs": lambda maze: maze.solve_uninformed(DequeStackFrontier()),
+    "bfs": lambda maze: maze.solve_uninformed(DequeQueueFrontier()),
+    "greedy": lambda maze: maze.solve_best_first(use_cost=False),
+    "astar": lambda maze: maze.solve_best_first(use_cost=True),
+    "jps": lambda maze: maze.solve_jump(),
+    "compact": lambda maze: maze.solve_compact()
+}
+
+
+def find_all(line, char):
+    """Yields every index of `char` in `line`."""
+    j = line.find(char)
+    while j != -1:
+        yield j
+        j = line.find(char, j + 1)
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(SOLVERS)}]")
+    strategy = sys.argv[2] if len(sys.argv) == 3 else "dfs"
+
+    m = Maze(sys.argv[1])
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(strategy)
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
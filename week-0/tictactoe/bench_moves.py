@@ -0,0 +1,73 @@
+"""
+Micro-benchmark of move application in tictactoe.py.
+
+Runs the same full minimax search (no pruning, no table) twice: once
+building a new board with `result` at every node, and once on a single
+`Position` with make/unmake. Reports nodes per second for each.
+"""
+
+import sys
+import time
+
+import tictactoe as ttt
+
+
+def functional_search(board, counter):
+    """
+    Returns the minimax value of the board, copying it at every move.
+    """
+    counter[0] += 1
+    if ttt.terminal(board):
+        return ttt.utility(board)
+    values = [functional_search(ttt.result(board, action), counter) for action in ttt.actions(board)]
+    return max(values) if ttt.player(board) == ttt.X else min(values)
+
+
+def inplace_search(position, counter, last=None):
+    """
+    Returns the minimax value of the position, changing it in place.
+    """
+    counter[0] += 1
+    if last is not None and position.completes_line(last):
+        return 1 if position.to_move == ttt.O else -1
+    if position.empty == 0:
+        return 0
+    values = []
+    for action in position.actions():
+        position.make(action)
+        values.append(inplace_search(position, counter, action))
+        position.unmake(action)
+    return max(values) if position.to_move == ttt.X else min(values)
+
+
+def measure(search, start):
+    counter = [0]
+    begin = time.perf_counter()
+    value = search(start, counter)
+    elapsed = time.perf_counter() - begin
+    return value, counter[0], elapsed
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python bench_moves.py [moves already played]")
+    played = int(sys.argv[1]) if len(sys.argv) == 2 else 0
+
+    # Start from a few moves into a game to keep the search short if wanted
+    board = ttt.initial_state()
+    for action in [(1, 1), (0, 0), (0, 1), (2, 1), (1, 0), (1, 2)][:played]:
+        board = ttt.result(board, action)
+
+    results = [
+        ("result", measure(functional_search, board)),
+        ("make/unmake", measure(inplace_search, ttt.Position(board)))
+    ]
+    if results[0][1][0] != results[1][1][0]:
+        sys.exit("Searches disagree on the value of the board")
+
+    for name, (value, nodes, elapsed) in results:
+        print(f"{name:<12} {nodes:>10,} nodes {elapsed:>8.2f}s {nodes / elapsed:>12,.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
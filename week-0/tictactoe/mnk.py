@@ -0,0 +1,333 @@
+"""
+m,n,k-game player (tic-tac-toe on an m x n board, k in a row to win)
+
+Boards are pairs of integer bitboards for X and O, with bit i * n + j for
+cell (i, j). Every line of k cells is precomputed as a bit mask, so a move
+only needs checking against the masks through its own cell. The functions
+below mirror tictactoe.py; minimax searches with iterative-deepening
+alpha-beta and stops when its time budget runs out.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a win; wins found sooner score higher
+WIN = 1000000
+
+# Nodes searched between checks of the clock
+CHECK_INTERVAL = 32
+
+# Transposition table flags: the stored value is exact, or only a bound
+EXACT, LOWER, UPPER = range(3)
+
+
+class Game():
+    """
+    Precomputed masks for an m x n board with k in a row to win.
+    """
+
+    def __init__(self, m, n, k):
+        self.m = m
+        self.n = n
+        self.k = k
+        self.cells = m * n
+
+        # Every line of k cells, and the lines through each cell
+        self.masks = []
+        for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            for i in range(m):
+                for j in range(n):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        mask = 0
+                        for step in range(k):
+                            mask |= self.bit(i + di * step, j + dj * step)
+                        self.masks.append(mask)
+        self.cell_masks = [
+            [mask for mask in self.masks if mask >> cell & 1]
+            for cell in range(self.cells)
+        ]
+
+        # Cells within two steps of each cell, where replies are searched
+        self.nearby = []
+        for cell in range(self.cells):
+            i, j = divmod(cell, n)
+            mask = 0
+            for a in range(max(0, i - 2), min(m, i + 3)):
+                for b in range(max(0, j - 2), min(n, j + 3)):
+                    mask |= self.bit(a, b)
+            self.nearby.append(mask)
+
+    def bit(self, i, j):
+        return 1 << (i * self.n + j)
+
+
+class Board():
+    """
+    Immutable position: the bitboards of X and O, the number of moves
+    made and the winner, if any.
+    """
+
+    __slots__ = ("game", "x", "o", "moves", "won")
+
+    def __init__(self, game, x=0, o=0, moves=0, won=EMPTY):
+        self.game = game
+        self.x = x
+        self.o = o
+        self.moves = moves
+        self.won = won
+
+    def __getitem__(self, i):
+        """
+        Returns row i as a list of X, O and EMPTY, like tictactoe.py boards.
+        """
+        n = self.game.n
+        row = []
+        for j in range(n):
+            cell = i * n + j
+            row.append(X if self.x >> cell & 1 else O if self.o >> cell & 1 else EMPTY)
+        return row
+
+    def __len__(self):
+        return self.game.m
+
+
+def initial_state(m=15, n=15, k=5):
+    """
+    Returns starting state of an m x n board with k in a row to win.
+    """
+    return Board(Game(m, n, k))
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if board.moves % 2 == 0 else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    n = board.game.n
+    return {divmod(cell, n) for cell in cells_of(empty_cells(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    Only the lines through the new move are checked for a win.
+    """
+    game = board.game
+    i, j = action
+    cell = i * game.n + j
+    if not (0 <= i < game.m and 0 <= j < game.n) or (board.x | board.o) >> cell & 1:
+        raise NameError("Can't make that move")
+    return play(board, cell)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return board.won
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return board.won is not EMPTY or board.moves == board.game.cells
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return 1 if board.won == X else -1 if board.won == O else 0
+
+
+def minimax(board, time_limit=1.0, max_depth=None):
+    """
+    Returns the best action found for the current player within
+    `time_limit` seconds, deepening the search one ply at a time.
+    """
+    if terminal(board):
+        return None
+
+    search = Search(board.game, time.perf_counter() + time_limit)
+    remaining = board.game.cells - board.moves
+    max_depth = remaining if max_depth is None else min(max_depth, remaining)
+
+    best = search.candidates(board)[0]
+    for depth in range(1, max_depth + 1):
+        try:
+            value, move = search.root(board, depth)
+        except TimeoutError:
+            break
+        best = move
+        if abs(value) >= WIN - board.game.cells:
+            break
+    return divmod(best, board.game.n)
+
+
+def play(board, cell):
+    """
+    Returns the board after the current player takes cell number `cell`.
+    """
+    game = board.game
+    bit = 1 << cell
+    if board.moves % 2 == 0:
+        x, o, mover, stones = board.x | bit, board.o, X, board.x | bit
+    else:
+        x, o, mover, stones = board.x, board.o | bit, O, board.o | bit
+    won = EMPTY
+    for mask in game.cell_masks[cell]:
+        if stones & mask == mask:
+            won = mover
+            break
+    return Board(game, x, o, board.moves + 1, won)
+
+
+def empty_cells(board):
+    return ~(board.x | board.o) & ((1 << board.game.cells) - 1)
+
+
+def cells_of(bits):
+    """
+    Yields the numbers of the set bits of `bits`, lowest first.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+class Search():
+    """
+    Depth-limited negamax alpha-beta search with a transposition table and
+    history-ordered moves, raising TimeoutError past the deadline.
+    """
+
+    def __init__(self, game, deadline):
+        self.game = game
+        self.deadline = deadline
+        self.table = {}
+        self.history = [0] * game.cells
+        self.nodes = 0
+
+    def root(self, board, depth):
+        """
+        Returns (value, cell) of the best move at this depth.
+        """
+        alpha, beta = -math.inf, math.inf
+        best_value, best_move = -math.inf, None
+        for cell in self.ordered(board, self.table.get((board.x, board.o))):
+            value = -self.negamax(play(board, cell), depth - 1, -beta, -alpha, 1)
+            if value > best_value:
+                best_value, best_move = value, cell
+            alpha = max(alpha, value)
+        self.table[(board.x, board.o)] = (depth, best_value, EXACT, best_move)
+        return best_value, best_move
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        """
+        Returns the value of the board for the player to move.
+        """
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise TimeoutError
+
+        if board.won is not EMPTY:
+            return -(WIN - ply)
+        if board.moves == self.game.cells:
+            return 0
+        if depth == 0:
+            return self.evaluate(board)
+
+        key = (board.x, board.o)
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, value, flag, _ = entry
+            if flag == EXACT:
+                return value
+            elif flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        original_alpha = alpha
+        best_value, best_move = -math.inf, None
+        for cell in self.ordered(board, entry):
+            value = -self.negamax(play(board, cell), depth - 1, -beta, -alpha, ply + 1)
+            if value > best_value:
+                best_value, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                self.history[cell] += depth * depth
+                break
+
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (depth, best_value, flag, best_move)
+        return best_value
+
+    def candidates(self, board):
+        """
+        Returns the empty cells near existing stones (the centre on an
+        empty board).
+        """
+        occupied = board.x | board.o
+        if not occupied:
+            return [(self.game.m // 2) * self.game.n + self.game.n // 2]
+        near = 0
+        for cell in cells_of(occupied):
+            near |= self.game.nearby[cell]
+        return list(cells_of(near & ~occupied)) or list(cells_of(empty_cells(board)))
+
+    def ordered(self, board, entry):
+        """
+        Returns candidate moves, the stored best move first and the rest
+        by how often they caused a cutoff.
+        """
+        moves = sorted(self.candidates(board), key=lambda cell: -self.history[cell])
+        if entry is not None and entry[3] in moves:
+            moves.remove(entry[3])
+            moves.insert(0, entry[3])
+        return moves
+
+    def evaluate(self, board):
+        """
+        Scores the board for the player to move: every line still open to
+        only one player counts for that player, more for more stones.
+        Lines without stones score nothing, so only the lines through
+        occupied cells are counted.
+        """
+        lines = set()
+        for cell in cells_of(board.x | board.o):
+            lines.update(self.game.cell_masks[cell])
+        score = 0
+        for mask in lines:
+            x = popcount(board.x & mask)
+            o = popcount(board.o & mask)
+            if x and not o:
+                score += 10 ** x
+            elif o and not x:
+                score -= 10 ** o
+        score = max(-(WIN // 2), min(WIN // 2, score))
+        return score if board.moves % 2 == 0 else -score
@@ -3,12 +3,32 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
+from functools import lru_cache
+from operator import itemgetter
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Transposition table flags: the stored value is exact, or only a bound
+EXACT, LOWER, UPPER = range(3)
+
+# Maps canonical board keys to (value, flag) from previous searches
+transposition_table = {}
+
+# Perfect-play table for 3x3 boards: one byte per base-3 board number,
+# holding (value + 1) << 4 | move, with move NO_MOVE on finished boards
+PERFECT_PLAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect_play.bin")
+NO_MOVE = 0x0F
+UNREACHABLE = 0xFF
+
+# Contents of PERFECT_PLAY_FILE once loaded, or None if it does not exist
+perfect_play = None
+
+# Number of boards visited by the searches below, for benchmarking
+nodes_searched = 0
+
 
 def initial_state():
     """
@@ -42,7 +62,7 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    board_copy = copy.deepcopy(board)
+    board_copy = [row[:] for row in board]
     current_player = player(board_copy)
     i, j = action
     if board_copy[i][j] == EMPTY:
@@ -52,32 +72,98 @@ def result(board, action):
         raise NameError("Can't make that move")
 
 
+class Position():
+    """
+    Mutable board for searching in place: `make` and `unmake` change a
+    single cell and keep the player to move and the number of empty cells
+    up to date, instead of copying the board and recounting it.
+    """
+
+    def __init__(self, board):
+        self.board = [row[:] for row in board]
+        self.size = len(board)
+        self.to_move = player(board)
+        self.empty = sum(row.count(EMPTY) for row in board)
+
+    def make(self, action):
+        """
+        Plays the current player's move (i, j) on the board.
+        """
+        i, j = action
+        if self.board[i][j] != EMPTY:
+            raise NameError("Can't make that move")
+        self.board[i][j] = self.to_move
+        self.to_move = O if self.to_move == X else X
+        self.empty -= 1
+
+    def unmake(self, action):
+        """
+        Takes back the move (i, j), which must be the last one made.
+        """
+        i, j = action
+        self.board[i][j] = EMPTY
+        self.to_move = O if self.to_move == X else X
+        self.empty += 1
+
+    def completes_line(self, action):
+        """
+        Returns True if the piece on (i, j) is part of a complete line,
+        checking only the lines through that cell.
+        """
+        i, j = action
+        piece = self.board[i][j]
+        size = self.size
+        for line in lines_through(size)[i * size + j]:
+            if all(self.board[k // size][k % size] == piece for k in line):
+                return True
+        return False
+
+    def actions(self):
+        return [
+            (i, j) for i in range(self.size) for j in range(self.size)
+            if self.board[i][j] == EMPTY
+        ]
+
+
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(len(board)):
-        row = board[i]
-        column = [ arr[i] for arr in board ]
-    
-        if column.count("X") == 3 or row.count("X") == 3:
-            return "X"
-        
-        if column.count("O") == 3 or row.count("O") == 3:
-            return "O"
-    
-    first_diag = [ board[0][0], board[1][1], board[2][2] ]
-    second_diag = [ board[0][2], board[1][1], board[2][0] ]
-
-    if first_diag.count("X") == 3 or second_diag.count("X") == 3:
-        return "X"
-    
-    if first_diag.count("O") == 3 or second_diag.count("O") == 3:
-        return "O"
-    
+    cells = [cell for row in board for cell in row]
+    for line in lines(len(board)):
+        first = cells[line[0]]
+        if first != EMPTY and all(cells[k] == first for k in line):
+            return first
     return None
 
 
+@lru_cache(maxsize=None)
+def lines(size):
+    """
+    Returns the rows, columns and diagonals of a size x size board,
+    as tuples of flat cell indices.
+    """
+    rows = [tuple(i * size + j for j in range(size)) for i in range(size)]
+    columns = [tuple(i * size + j for i in range(size)) for j in range(size)]
+    diagonals = [
+        tuple(i * size + i for i in range(size)),
+        tuple(i * size + size - 1 - i for i in range(size))
+    ]
+    return rows + columns + diagonals
+
+
+@lru_cache(maxsize=None)
+def lines_through(size):
+    """
+    Returns, for each flat cell index, the lines that pass through it.
+    """
+    through = [[] for _ in range(size * size)]
+    for line in lines(size):
+        for k in line:
+            through[k].append(line)
+    return through
+
+
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
@@ -99,9 +185,38 @@ def utility(board):
     return 0
 
 
-def minimax(board):
+def minimax(board, use_table=True):
     """
     Returns the optimal action for the current player on the board.
+    Pass `use_table=False` to always search instead of using the
+    perfect-play table.
+    """
+    if terminal(board):
+        return None
+
+    move = perfect_move(board) if use_table else None
+    if move is not None:
+        return move
+
+    maximizing = player(board) == X
+    best_action = None
+    best_value = -math.inf if maximizing else math.inf
+    alpha, beta = -math.inf, math.inf
+    for action in ordered_actions(board):
+        value = alphabeta(result(board, action), alpha, beta)
+        if maximizing and value > best_value:
+            best_action, best_value = action, value
+            alpha = max(alpha, value)
+        elif not maximizing and value < best_value:
+            best_action, best_value = action, value
+            beta = min(beta, value)
+    return best_action
+
+
+def full_minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    searching the whole game tree without pruning.
     """
     current_player = player(board)
     if current_player == "X":
@@ -111,10 +226,255 @@ def minimax(board):
         action_values = [(action, max_value(result(board, action))) for action in actions(board)]
         return min(action_values, key=lambda x: x[1])[0]
 
+
+def alphabeta(board, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the minimax value of the board, searching with alpha-beta
+    pruning and reusing values of symmetric positions already searched.
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+
+    key = canonical_key(board)
+    entry = transposition_table.get(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT:
+            return value
+        elif flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    original_alpha, original_beta = alpha, beta
+    maximizing = player(board) == X
+    best = -math.inf if maximizing else math.inf
+    for action in ordered_actions(board):
+        value = alphabeta(result(board, action), alpha, beta)
+        if maximizing:
+            best = max(best, value)
+            alpha = max(alpha, best)
+        else:
+            best = min(best, value)
+            beta = min(beta, best)
+        if alpha >= beta:
+            break
+
+    if best <= original_alpha:
+        flag = UPPER
+    elif best >= original_beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    transposition_table[key] = (best, flag)
+    return best
+
+
+def depth_limited_minimax(board, depth):
+    """
+    Returns the best action for the current player when looking only
+    `depth` moves ahead and estimating the boards found there.
+    """
+    if terminal(board):
+        return None
+
+    maximizing = player(board) == X
+    best_action = None
+    best_value = -math.inf if maximizing else math.inf
+    for action in ordered_actions(board):
+        value = depth_limited_value(result(board, action), depth - 1, -math.inf, math.inf)
+        if (maximizing and value > best_value) or (not maximizing and value < best_value):
+            best_action, best_value = action, value
+    return best_action
+
+
+def depth_limited_value(board, depth, alpha, beta):
+    """
+    Returns the alpha-beta value of the board searched `depth` moves deep,
+    using `estimate` for unfinished boards at the limit.
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+    if depth <= 0:
+        return estimate(board)
+
+    maximizing = player(board) == X
+    best = -math.inf if maximizing else math.inf
+    for action in ordered_actions(board):
+        value = depth_limited_value(result(board, action), depth - 1, alpha, beta)
+        if maximizing:
+            best = max(best, value)
+            alpha = max(alpha, best)
+        else:
+            best = min(best, value)
+            beta = min(beta, best)
+        if alpha >= beta:
+            break
+    return best
+
+
+def estimate(board):
+    """
+    Returns a value strictly between -1 and 1: the number of lines still
+    open only to X minus those open only to O, scaled down.
+    """
+    cells = [cell for row in board for cell in row]
+    all_lines = lines(len(board))
+    score = 0
+    for line in all_lines:
+        pieces = {cells[k] for k in line} - {EMPTY}
+        if pieces == {X}:
+            score += 1
+        elif pieces == {O}:
+            score -= 1
+    return score / (len(all_lines) + 1)
+
+
+def ordered_actions(board):
+    """
+    Returns the available actions, those on the most winning lines first
+    (the centre, then corners, then edges on a 3x3 board).
+    """
+    weights = line_counts(len(board))
+    return sorted(actions(board), key=lambda action: -weights[action])
+
+
+@lru_cache(maxsize=None)
+def line_counts(size):
+    """
+    Returns a dictionary mapping each cell to the number of lines through it.
+    """
+    counts = {(i, j): 0 for i in range(size) for j in range(size)}
+    for line in lines(size):
+        for k in line:
+            counts[divmod(k, size)] += 1
+    return counts
+
+
+def canonical_key(board):
+    """
+    Returns a string that is the same for a board and all of its
+    rotations and reflections.
+    """
+    cells = "".join("." if cell == EMPTY else cell for row in board for cell in row)
+    return min("".join(permute(cells)) for permute in symmetries(len(board)))
+
+
+@lru_cache(maxsize=None)
+def symmetries(size):
+    """
+    Returns functions mapping a flat sequence of cells to each of the
+    8 rotations and reflections of a size x size board.
+    """
+    transforms = [
+        lambda i, j: (i, j),
+        lambda i, j: (j, size - 1 - i),
+        lambda i, j: (size - 1 - i, size - 1 - j),
+        lambda i, j: (size - 1 - j, i),
+        lambda i, j: (i, size - 1 - j),
+        lambda i, j: (size - 1 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (size - 1 - j, size - 1 - i)
+    ]
+    permutations = []
+    for transform in transforms:
+        order = [0] * (size * size)
+        for i in range(size):
+            for j in range(size):
+                ti, tj = transform(i, j)
+                order[ti * size + tj] = i * size + j
+        permutations.append(itemgetter(*order))
+    return permutations
+
+def board_number(board):
+    """
+    Returns the board read as a base-3 number (EMPTY 0, X 1, O 2).
+    """
+    number = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            number = number * 3 + (0 if cell == EMPTY else 1 if cell == X else 2)
+    return number
+
+
+def perfect_play_entry(board):
+    """
+    Returns the perfect-play table byte for a 3x3 board, or None if the
+    table is missing or does not cover the board.
+    """
+    global perfect_play
+    if len(board) != 3:
+        return None
+    if perfect_play is None:
+        if not os.path.exists(PERFECT_PLAY_FILE):
+            return None
+        with open(PERFECT_PLAY_FILE, "rb") as f:
+            perfect_play = f.read()
+    entry = perfect_play[board_number(board)]
+    return None if entry == UNREACHABLE else entry
+
+
+def perfect_move(board):
+    """
+    Returns the optimal action from the perfect-play table, or None.
+    """
+    entry = perfect_play_entry(board)
+    if entry is None or entry & 0x0F == NO_MOVE:
+        return None
+    return divmod(entry & 0x0F, 3)
+
+
+def perfect_value(board):
+    """
+    Returns the game-theoretic value (1, 0 or -1) of a 3x3 board from the
+    perfect-play table, or None.
+    """
+    entry = perfect_play_entry(board)
+    return None if entry is None else (entry >> 4) - 1
+
+
+def solve_perfect_play():
+    """
+    Enumerates every board reachable from the initial state and returns
+    the perfect-play table for them, as bytes.
+    """
+    table = bytearray([UNREACHABLE]) * 3 ** 9
+    boards = [initial_state()]
+    while boards:
+        board = boards.pop()
+        number = board_number(board)
+        if table[number] != UNREACHABLE:
+            continue
+
+        value = alphabeta(board)
+        if terminal(board):
+            table[number] = (value + 1) << 4 | NO_MOVE
+            continue
+
+        # Prefer winning at once, then the first optimal move in search order
+        options = ordered_actions(board)
+        options.sort(key=lambda action: winner(result(board, action)) is None)
+        for action in options:
+            if alphabeta(result(board, action)) == value:
+                i, j = action
+                table[number] = (value + 1) << 4 | (i * 3 + j)
+                break
+        boards.extend(result(board, action) for action in actions(board))
+    return bytes(table)
+
+
 def max_value(board):
     """
     Returns the highest possible utility value from a given board
     """
+    global nodes_searched
+    nodes_searched += 1
     v = -math.inf
     if terminal(board):
         return utility(board)
@@ -127,6 +487,8 @@ def min_value(board):
     """
     Returns the lowest possible utility value from a given board
     """
+    global nodes_searched
+    nodes_searched += 1
     v = math.inf
     if terminal(board):
         return utility(board)
@@ -134,3 +496,11 @@ def min_value(board):
     for action in actions(board):
         v = min(v, max_value(result(board, action)))
     return v
+
+
+if __name__ == "__main__":
+    table = solve_perfect_play()
+    with open(PERFECT_PLAY_FILE, "wb") as f:
+        f.write(table)
+    reachable = sum(1 for entry in table if entry != UNREACHABLE)
+    print(f"Saved perfect play for {reachable} boards to {PERFECT_PLAY_FILE}.")
@@ -0,0 +1,137 @@
+"""
+Headless self-play tournament for the tictactoe.py engines.
+
+Plays every ordered pairing of the chosen engines, including each engine
+against itself, across a pool of processes, then reports outcomes per pairing and,
+per engine, the boards searched and time-per-move percentiles.
+
+Engines:
+    full        minimax over the whole tree, without pruning
+    alphabeta   alpha-beta search with the transposition table
+    table       lookup in the perfect-play table
+    depthN      alpha-beta limited to N moves ahead, e.g. depth2
+    random      a uniformly random legal move
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import tictactoe as ttt
+
+
+def valid_engine(engine):
+    if engine.startswith("depth"):
+        return engine[len("depth"):].isdigit()
+    return engine in ["full", "alphabeta", "table", "random"]
+
+
+def choose(engine, board, rng):
+    """
+    Returns the action `engine` plays on the board.
+    """
+    if engine == "full":
+        return ttt.full_minimax(board)
+    elif engine == "alphabeta":
+        return ttt.minimax(board, use_table=False)
+    elif engine == "table":
+        return ttt.minimax(board)
+    elif engine.startswith("depth"):
+        return ttt.depth_limited_minimax(board, int(engine[len("depth"):]))
+    elif engine == "random":
+        return rng.choice(ttt.actions(board))
+    raise ValueError(f"unknown engine: {engine}")
+
+
+def play_game(task):
+    """
+    Plays one game and returns (x engine, o engine, winner, moves), where
+    moves lists (engine, seconds, boards searched) for every move.
+    """
+    x_engine, o_engine, seed = task
+    rng = random.Random(seed)
+
+    # Each game starts without anything remembered from earlier games
+    ttt.transposition_table.clear()
+
+    board = ttt.initial_state()
+    moves = []
+    while not ttt.terminal(board):
+        engine = x_engine if ttt.player(board) == ttt.X else o_engine
+        nodes = ttt.nodes_searched
+        start = time.perf_counter()
+        action = choose(engine, board, rng)
+        elapsed = time.perf_counter() - start
+        moves.append((engine, elapsed, ttt.nodes_searched - nodes))
+        board = ttt.result(board, action)
+    return x_engine, o_engine, ttt.winner(board), moves
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at `fraction` through the sorted `values`.
+    """
+    index = min(len(values) - 1, int(fraction * len(values)))
+    return values[index]
+
+
+def report(games):
+    """
+    Prints outcome statistics per pairing and search statistics per engine.
+    """
+    outcomes = {}
+    times = {}
+    nodes = {}
+    for x_engine, o_engine, winner, moves in games:
+        counts = outcomes.setdefault((x_engine, o_engine), {ttt.X: 0, ttt.O: 0, None: 0})
+        counts[winner] += 1
+        for engine, elapsed, searched in moves:
+            times.setdefault(engine, []).append(elapsed)
+            nodes[engine] = nodes.get(engine, 0) + searched
+
+    print(f"{'X':<12}{'O':<12}{'games':>8}{'X wins':>8}{'O wins':>8}{'draws':>8}")
+    for (x_engine, o_engine), counts in sorted(outcomes.items()):
+        total = sum(counts.values())
+        print(f"{x_engine:<12}{o_engine:<12}{total:>8}"
+              f"{counts[ttt.X]:>8}{counts[ttt.O]:>8}{counts[None]:>8}")
+    print()
+
+    print(f"{'engine':<12}{'moves':>8}{'nodes/move':>12}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for engine, values in sorted(times.items()):
+        values.sort()
+        print(f"{engine:<12}{len(values):>8}{nodes[engine] / len(values):>12,.1f}"
+              + "".join(f"{1000 * percentile(values, p):>10.3f}" for p in [0.5, 0.9, 0.99])
+              + f"{1000 * values[-1]:>10.3f}")
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python tournament.py games engine [engine ...]")
+    games_per_pairing = int(sys.argv[1])
+    engines = sys.argv[2:]
+    for engine in engines:
+        if not valid_engine(engine):
+            sys.exit(f"Unknown engine: {engine}")
+
+    tasks = []
+    seed = 0
+    for x_engine in engines:
+        for o_engine in engines:
+            for _ in range(games_per_pairing):
+                tasks.append((x_engine, o_engine, seed))
+                seed += 1
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        games = pool.map(play_game, tasks, chunksize=max(1, len(tasks) // (4 * os.cpu_count())))
+    elapsed = time.perf_counter() - start
+
+    print(f"Played {len(games)} games in {elapsed:.2f}s\n")
+    report(games)
+
+
+if __name__ == "__main__":
+    main()
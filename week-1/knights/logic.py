@@ -1,8 +1,74 @@
 import itertools
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import weakref
+from array import array
+
+# Header of files written by save_knowledge
+MAGIC = b"LOGICKB1"
+
+# Node kinds in files written by save_knowledge
+SYMBOL, NOT, AND, OR, IMPLICATION, BICONDITIONAL = range(6)
+
+# Tokens of the formula syntax: operators, parentheses and symbol names
+# (or any other character, which is an error)
+TOKEN = re.compile(r"\s*(?:(<=>|=>|[()¬∧∨]|[^()¬∧∨<=]+)|(\S))")
+
+# Binding strength of the binary operators; ¬ binds tighter than all
+PRECEDENCE = {"<=>": 1, "=>": 2, "∨": 3, "∧": 4}
 
 
 class Sentence():
 
+    # Cached symbol set and hash, computed on first use, and whether
+    # neither the sentence nor any sentence inside it can change
+    __slots__ = ("_symbols", "_hash", "_frozen", "__weakref__")
+
+    # Sentences that cannot change, keyed by class and operands, so that
+    # identical subformulas are built once and shared (hash-consing)
+    interned = weakref.WeakValueDictionary()
+
+    # Whether sentences of this class can change after they are built
+    immutable = False
+
+    def __new__(cls, *operands):
+        """
+        Returns the existing sentence with the same class and operands if
+        the sentence and all its operands are frozen, else a new one.
+        """
+        if not cls.immutable or not all(
+            isinstance(operand, str)
+            or (isinstance(operand, Sentence) and operand._frozen)
+            for operand in operands
+        ):
+            return super().__new__(cls)
+        key = (cls, *operands)
+        sentence = Sentence.interned.get(key)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            Sentence.interned[key] = sentence
+        return sentence
+
+    def __init__(self, *operands):
+        self._symbols = None
+        self._hash = None
+
+        # Caches stay valid only if no And or Or inside can be changed
+        self._frozen = self.immutable and all(
+            operand._frozen for operand in operands
+        )
+
+    def initialised(self):
+        """
+        Returns True if the sentence was already initialised, as happens
+        when __new__ returns an interned sentence, so that __init__ keeps
+        its cached symbols and hash.
+        """
+        return hasattr(self, "_hash")
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -11,9 +77,62 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def operands(self):
+        """Returns the sentences this sentence is built from."""
+        return []
+
+    def expression(self, index, vectorized=False):
+        """
+        Returns Python source evaluating the sentence over an array v of
+        symbol values, where index maps each symbol name to its position.
+        If vectorized, v is a NumPy boolean array with one row per model.
+        """
+        return self.combine(
+            [operand.expression(index, vectorized)
+             for operand in self.operands()],
+            index, vectorized
+        )
+
+    def combine(self, operands, index, vectorized=False):
+        """
+        Returns Python source for the sentence given the source of each
+        of its operands, in the order of operands().
+        """
+        raise Exception("nothing to compile")
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """
+        Returns the symbols as a frozenset, walking the sentence without
+        recursion. Frozen sentences cache it after the first call.
+        """
+        if self._symbols is not None:
+            return self._symbols
+        symbols = set()
+        seen = set()
+        stack = [self]
+        while stack:
+            sentence = stack.pop()
+            if sentence._symbols is not None:
+                symbols.update(sentence._symbols)
+            elif isinstance(sentence, Symbol):
+                symbols.add(sentence.name)
+            elif id(sentence) not in seen:
+                seen.add(id(sentence))
+                stack.extend(sentence.operands())
+        symbols = frozenset(symbols)
+        if self._frozen:
+            self._symbols = symbols
+        return symbols
+
+    def cache_hash(self, value):
+        """Returns a hash value, caching it if the sentence is frozen."""
+        if self._frozen:
+            self._hash = value
+        return value
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +162,27 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+    immutable = True
 
     def __init__(self, name):
+        if self.initialised():
+            return
+        super().__init__()
         self.name = name
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            return self.cache_hash(hash(("symbol", self.name)))
+        return self._hash
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __repr__(self):
         return self.name
@@ -65,20 +196,35 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def combine(self, operands, index, vectorized=False):
+        if vectorized:
+            return f"v[:, {index[self.name]}]"
+        return f"v[{index[self.name]}]"
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+    immutable = True
+
     def __init__(self, operand):
+        if self.initialised():
+            return
         Sentence.validate(operand)
+        super().__init__(operand)
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is None:
+            return self.cache_hash(hash(("not", hash(self.operand))))
+        return self._hash
+
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +235,33 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def operands(self):
+        return [self.operand]
+
+    def combine(self, operands, index, vectorized=False):
+        operand, = operands
+        return f"(~{operand})" if vectorized else f"(not {operand})"
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
+        super().__init__()
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        return hash(("and", tuple(hash(conjunct) for conjunct in self.conjuncts)))
+
+    def __reduce__(self):
+        return (And, tuple(self.conjuncts))
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -126,23 +282,35 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def operands(self):
+        return self.conjuncts
+
+    def combine(self, operands, index, vectorized=False):
+        if not operands:
+            return "np.True_" if vectorized else "True"
+        operator = " & " if vectorized else " and "
+        return "(" + operator.join(operands) + ")"
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
+        super().__init__()
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return hash(("or", tuple(hash(disjunct) for disjunct in self.disjuncts)))
+
+    def __reduce__(self):
+        return (Or, tuple(self.disjuncts))
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +325,46 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def operands(self):
+        return self.disjuncts
+
+    def combine(self, operands, index, vectorized=False):
+        if not operands:
+            return "np.False_" if vectorized else "False"
+        operator = " | " if vectorized else " or "
+        return "(" + operator.join(operands) + ")"
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+    immutable = True
+
     def __init__(self, antecedent, consequent):
+        if self.initialised():
+            return
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
+        super().__init__(antecedent, consequent)
         self.antecedent = antecedent
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and hash(self) == hash(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is None:
+            return self.cache_hash(hash(
+                ("implies", hash(self.antecedent), hash(self.consequent))
+            ))
+        return self._hash
+
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +378,46 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def operands(self):
+        return [self.antecedent, self.consequent]
+
+    def combine(self, operands, index, vectorized=False):
+        antecedent, consequent = operands
+        if vectorized:
+            return f"(~{antecedent} | {consequent})"
+        return f"(not {antecedent} or {consequent})"
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+    immutable = True
+
     def __init__(self, left, right):
+        if self.initialised():
+            return
         Sentence.validate(left)
         Sentence.validate(right)
+        super().__init__(left, right)
         self.left = left
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and hash(self) == hash(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is None:
+            return self.cache_hash(hash(
+                ("biconditional", hash(self.left), hash(self.right))
+            ))
+        return self._hash
+
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -217,16 +429,472 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def operands(self):
+        return [self.left, self.right]
+
+    def combine(self, operands, index, vectorized=False):
+        left, right = operands
+        return f"({left} == {right})"
+
 
+class Compiled():
+    """
+    A sentence compiled to a Python function over a list of symbol values,
+    so evaluating it needs no tree walk or dict lookups.
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    The function is a single expression, which short-circuits. Python
+    cannot compile expressions nested a few hundred levels deep, so such
+    sentences get a function with one assignment per subsentence instead.
+    """
+
+    def __init__(self, sentence, symbols=None):
+        if symbols is None:
+            symbols = sorted(sentence.symbols())
+        self.sentence = sentence
+        self.symbols = list(symbols)
+        self.index = {name: i for i, name in enumerate(self.symbols)}
+        self.source, self.function = self.compile()
+        self.vectorized_function = None
+
+    def compile(self, vectorized=False, namespace=None):
+        """Returns the source and function evaluating the sentence."""
+        try:
+            source = f"lambda v: {self.sentence.expression(self.index, vectorized)}"
+            return source, eval(source, namespace)
+        except (SyntaxError, MemoryError, RecursionError):
+            source = self.flat_source(vectorized)
+            namespace = dict(namespace or {})
+            exec(source, namespace)
+            return source, namespace["f"]
+
+    def flat_source(self, vectorized=False):
+        """
+        Returns source defining a function f that assigns each compound
+        subsentence to a temporary, operands first, walking the sentence
+        without recursion. Shared subsentences are computed once.
+        """
+        names = dict()
+        lines = ["def f(v):"]
+        stack = [(self.sentence, False)]
+        while stack:
+            sentence, expanded = stack.pop()
+            if id(sentence) in names:
+                continue
+            operands = sentence.operands()
+            if operands and not expanded:
+                stack.append((sentence, True))
+                stack.extend((operand, False) for operand in operands)
+                continue
+            source = sentence.combine(
+                [names[id(operand)] for operand in operands],
+                self.index, vectorized
+            )
+            if operands:
+                name = f"t{len(lines) - 1}"
+                lines.append(f"    {name} = {source}")
+                source = name
+            names[id(sentence)] = source
+        lines.append(f"    return {names[id(self.sentence)]}")
+        return "\n".join(lines)
+
+    def evaluate(self, values):
+        """Evaluates the sentence given a value for each symbol, in order."""
+        return bool(self.function(values))
+
+    def evaluate_model(self, model):
+        """Evaluates the sentence in a model mapping names to values."""
+        try:
+            return self.evaluate([bool(model[name]) for name in self.symbols])
+        except KeyError as e:
+            raise Exception(f"variable {e.args[0]} not in model")
+
+    def evaluate_batch(self, values):
+        """
+        Evaluates the sentence in many models at once, given a NumPy
+        boolean array with one row per model and one column per symbol.
+        Returns a boolean array with one entry per model.
+        """
+        import numpy as np
+
+        if self.vectorized_function is None:
+            _, self.vectorized_function = self.compile(True, {"np": np})
+        values = np.asarray(values, dtype=bool)
+        result = self.vectorized_function(values)
+        return np.broadcast_to(result, values.shape[:1]).copy()
+
+
+class KnowledgeBase():
+    """
+    A conjunction of sentences together with every model that satisfies
+    it, so that many queries can be answered without enumerating again.
+
+    Models are tuples of truth values, one per name in self.symbols.
+    Adding a sentence extends the cached models only with the symbols it
+    introduces, then keeps the models in which it holds. The "enumerate"
+    backend tries every assignment of the new symbols; the "dpll" backend
+    asks a SAT solver for just the assignments that satisfy the sentence.
+    """
+
+    def __init__(self, *sentences, backend="enumerate"):
+        if backend not in ("enumerate", "dpll"):
+            raise ValueError(f"unknown backend {backend!r}")
+        self.backend = backend
+        self.knowledge = And()
+        self.symbols = []
+        self.models = [()]
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence, keeping only the cached models where it holds."""
+        Sentence.validate(sentence)
+        self.knowledge.add(sentence)
+
+        # Apply conjuncts that introduce no new symbols first, then the one
+        # introducing the fewest, so that the models grow as little as
+        # possible before they are filtered
+        pending = list(self.conjuncts(sentence))
+        while pending:
+            known = set(self.symbols)
+            waiting = []
+            for conjunct in pending:
+                if conjunct.symbol_set() <= known:
+                    self.restrict(conjunct)
+                else:
+                    waiting.append(conjunct)
+            if waiting:
+                nearest = min(
+                    waiting,
+                    key=lambda conjunct: len(conjunct.symbol_set() - known)
+                )
+                waiting.remove(nearest)
+                self.restrict(nearest)
+            pending = waiting
+
+    def conjuncts(self, sentence):
+        """Yields the conjuncts of a sentence, flattening nested Ands."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                yield from self.conjuncts(conjunct)
+        else:
+            yield sentence
+
+    def restrict(self, sentence):
+        """
+        Extends the models with any new symbols in the sentence and keeps
+        those in which the sentence holds.
+        """
+        new = sorted(sentence.symbol_set() - set(self.symbols))
+        if new and self.backend == "dpll":
+            self.models = self.solve_extensions(sentence, new)
+            self.symbols.extend(new)
+            return
+
+        if new:
+            extensions = list(
+                itertools.product((False, True), repeat=len(new))
+            )
+            self.models = [model + extension
+                           for model in self.models
+                           for extension in extensions]
+            self.symbols.extend(new)
+        compiled = Compiled(sentence, self.symbols)
+        self.models = [model for model in self.models
+                       if compiled.evaluate(model)]
+
+    def solve_extensions(self, sentence, new):
+        """
+        Returns each model extended with every assignment of the new
+        symbols under which the sentence holds, found with a SAT solver.
+        """
+        from sat import CNF, Solver
+
+        cnf = CNF()
+        cnf.add(sentence)
+        positions = [i for i, name in enumerate(self.symbols)
+                     if name in sentence.symbol_set()]
+        old_variables = [cnf.variable(self.symbols[i]) for i in positions]
+        new_variables = [cnf.variable(name) for name in new]
+        solver = Solver(cnf.clauses, cnf.count)
+
+        # Models that agree on the sentence's old symbols share extensions
+        extensions = dict()
+        models = []
+        for model in self.models:
+            key = tuple(model[i] for i in positions)
+            if key not in extensions:
+                assumptions = [variable if value else -variable
+                               for variable, value in zip(old_variables, key)]
+                found = []
+                solution = solver.solve(assumptions)
+                while solution is not None:
+                    extension = tuple(solution[v] for v in new_variables)
+                    found.append(extension)
+
+                    # Block this extension under these assumptions
+                    solver.add_clause(
+                        [-literal for literal in assumptions]
+                        + [-v if value else v
+                           for v, value in zip(new_variables, extension)]
+                    )
+                    solution = solver.solve(assumptions)
+                extensions[key] = found
+            models.extend(model + extension for extension in extensions[key])
+        return models
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        return self.entailed([query])[0]
+
+    def entailed(self, queries):
+        """
+        Returns, for each query, whether the knowledge base entails it,
+        checking all of them in one pass over the cached models.
+        """
+        checks = []
+        for query in queries:
+
+            # A query about symbols the knowledge base never mentions
+            # must hold for every value of those symbols
+            extra = sorted(query.symbol_set() - set(self.symbols))
+            compiled = Compiled(query, self.symbols + extra)
+            extensions = list(
+                itertools.product((False, True), repeat=len(extra))
+            )
+            checks.append((compiled, extensions))
+
+        results = [True] * len(checks)
+        undecided = list(range(len(checks)))
+        for model in self.models:
+            remaining = []
+            for i in undecided:
+                compiled, extensions = checks[i]
+                if all(compiled.evaluate(model + extension)
+                       for extension in extensions):
+                    remaining.append(i)
+                else:
+                    results[i] = False
+            undecided = remaining
+            if not undecided:
+                break
+        return results
+
+
+def parse(formula):
+    """
+    Parses a formula in the syntax written by Sentence.formula(), such as
+    "¬rain => hagrid" or "(red0) ∧ ((blue1) ∨ (green2))". ¬ binds
+    tightest, then ∧, ∨, => and <=>; => groups to the right.
+    Parentheses and operators are kept on explicit stacks rather than
+    parsed by recursion, so formulas of any depth can be read back.
+    """
+    tokens = []
+    for match in TOKEN.finditer(formula):
+        if match.group(2):
+            raise ValueError(
+                f"unexpected character at {match.start(2)}: {formula!r}"
+            )
+        token = match.group(1).strip()
+        if token:
+            tokens.append(token)
+    if not tokens:
+        return And()
+
+    # A final None marks the end of the formula
+    tokens.append(None)
+
+    def combine(operator, operands):
+        if operator == "∧":
+            return And(*operands)
+        if operator == "∨":
+            return Or(*operands)
+        if operator == "=>":
+            return Implication(*operands)
+        return Biconditional(*operands)
+
+    def negate(sentence, count):
+        for _ in range(count):
+            sentence = Not(sentence)
+        return sentence
+
+    # Operators waiting for their last operand, as [operator, operands],
+    # binding more tightly towards the top; the ¬s read before the next
+    # operand; and for each open parenthesis, the ¬s before it and the
+    # operators waiting outside it
+    pending = []
+    negations = 0
+    frames = []
+
+    # The operand just read, or None if one is expected next
+    sentence = None
+    for token in tokens:
+        if sentence is None:
+            if token == "¬":
+                negations += 1
+            elif token == "(":
+                frames.append((negations, pending))
+                negations, pending = 0, []
+            elif token is None or token in PRECEDENCE or token == ")":
+                found = "end of formula" if token is None else repr(token)
+                raise ValueError(f"expected a symbol, found {found}")
+            else:
+                sentence = negate(Symbol(token), negations)
+                negations = 0
+            continue
+
+        if token in PRECEDENCE:
+            rank = PRECEDENCE[token]
+
+            # Complete tighter operators, and an earlier <=> since <=>
+            # groups to the left
+            while pending and (
+                PRECEDENCE[pending[-1][0]] > rank
+                or pending[-1][0] == token == "<=>"
+            ):
+                operator, operands = pending.pop()
+                sentence = combine(operator, operands + [sentence])
+            if pending and pending[-1][0] == token and token in ("∧", "∨"):
+                pending[-1][1].append(sentence)
+            else:
+                pending.append([token, [sentence]])
+            sentence = None
+            continue
+
+        if token is not None and token != ")":
+            if frames:
+                raise ValueError(f"expected ')', found {token!r}")
+            raise ValueError(f"unexpected {token!r} after sentence")
+        while pending:
+            operator, operands = pending.pop()
+            sentence = combine(operator, operands + [sentence])
+        if token is None:
+            if frames:
+                raise ValueError("expected ')', found end of formula")
+            return sentence
+        if not frames:
+            raise ValueError("unexpected ')' after sentence")
+        negations, pending = frames.pop()
+        sentence = negate(sentence, negations)
+        negations = 0
+
+
+def save_knowledge(knowledge, filename):
+    """
+    Writes a sentence to a binary file as a table of nodes, children
+    before parents. A node shared by several sentences is written once.
+    """
+    names = dict()
+    codes = array("i")
+    nodes = dict()
+
+    def write(sentence):
+        """Writes a node and its children. Returns its node number."""
+
+        # And and Or can change, so only the same object is the same node
+        key = sentence if sentence.immutable else id(sentence)
+        if key in nodes:
+            return nodes[key]
+        if isinstance(sentence, Symbol):
+            code = [SYMBOL, names.setdefault(sentence.name, len(names))]
+        elif isinstance(sentence, Not):
+            code = [NOT, write(sentence.operand)]
+        elif isinstance(sentence, (And, Or)):
+            operands = (sentence.conjuncts if isinstance(sentence, And)
+                        else sentence.disjuncts)
+            code = [AND if isinstance(sentence, And) else OR, len(operands),
+                    *[write(operand) for operand in operands]]
+        elif isinstance(sentence, Implication):
+            code = [IMPLICATION, write(sentence.antecedent),
+                    write(sentence.consequent)]
+        elif isinstance(sentence, Biconditional):
+            code = [BICONDITIONAL, write(sentence.left), write(sentence.right)]
+        else:
+            raise TypeError(f"cannot save {sentence!r}")
+        codes.extend(code)
+        nodes[key] = len(nodes)
+        return nodes[key]
+
+    Sentence.validate(knowledge)
+    write(knowledge)
+    text = "\0".join(names).encode("utf-8")
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<BQQ", sys.byteorder == "little",
+                            len(text), len(codes)))
+        f.write(text)
+        f.write(codes.tobytes())
+
+
+def load_knowledge(filename):
+    """Reads a sentence written by save_knowledge."""
+    with open(filename, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise Exception(f"{filename} is not a knowledge base file")
+    little, text_length, code_length = struct.unpack_from(
+        "<BQQ", data, len(MAGIC)
+    )
+    if bool(little) != (sys.byteorder == "little"):
+        raise Exception("file was written on a machine with different byte order")
+
+    position = len(MAGIC) + struct.calcsize("<BQQ")
+    names = data[position:position + text_length].decode("utf-8").split("\0")
+    position += text_length
+    codes = array("i")
+    codes.frombytes(data[position:position + 4 * code_length])
+
+    nodes = []
+    i = 0
+    while i < len(codes):
+        kind = codes[i]
+        if kind == SYMBOL:
+            nodes.append(Symbol(names[codes[i + 1]]))
+            i += 2
+        elif kind == NOT:
+            nodes.append(Not(nodes[codes[i + 1]]))
+            i += 2
+        elif kind in (AND, OR):
+            count = codes[i + 1]
+            operands = [nodes[k] for k in codes[i + 2:i + 2 + count]]
+            nodes.append(And(*operands) if kind == AND else Or(*operands))
+            i += 2 + count
+        elif kind in (IMPLICATION, BICONDITIONAL):
+            left, right = nodes[codes[i + 1]], nodes[codes[i + 2]]
+            nodes.append(Implication(left, right) if kind == IMPLICATION
+                         else Biconditional(left, right))
+            i += 3
+        else:
+            raise Exception(f"unknown node kind {kind} in {filename}")
+    return nodes[-1]
+
+
+def model_check(knowledge, query, backend="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    The "enumerate" backend tries every model of the symbols, walking
+    the sentence trees; "compiled" tries every model with the sentences
+    compiled to Python functions, "vectorized" evaluates them over
+    batches of models with NumPy, and "parallel" splits the models across
+    a pool of processes. The "dpll" backend converts both
+    sentences to CNF and searches for a model of the knowledge base in
+    which the query is false (see sat.py).
+    """
+    if backend == "dpll":
+        from sat import entails
+        return entails(knowledge, query)
+    elif backend == "compiled":
+        return compiled_model_check(knowledge, query)
+    elif backend == "vectorized":
+        return vectorized_model_check(knowledge, query)
+    elif backend == "parallel":
+        return parallel_model_check(knowledge, query)
+    elif backend != "enumerate":
+        raise ValueError(f"unknown backend {backend!r}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +929,103 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating a compiled
+    sentence in every model.
+    """
+    counterexample = Compiled(And(knowledge, Not(query)))
+    for values in itertools.product((False, True),
+                                    repeat=len(counterexample.symbols)):
+        if counterexample.evaluate(values):
+            return False
+    return True
+
+
+def vectorized_model_check(knowledge, query, batch_size=1 << 16):
+    """
+    Checks if knowledge base entails query by evaluating a compiled
+    sentence over batches of models with NumPy.
+    """
+    import numpy as np
+
+    counterexample = Compiled(And(knowledge, Not(query)))
+    count = len(counterexample.symbols)
+    bits = np.arange(count, dtype=np.int64)
+    for start in range(0, 1 << count, batch_size):
+        end = min(start + batch_size, 1 << count)
+
+        # Row k holds the binary digits of model number start + k
+        models = np.arange(start, end, dtype=np.int64)
+        values = (models[:, None] >> bits) & 1 == 1
+        if counterexample.evaluate_batch(values).any():
+            return False
+    return True
+
+
+# Compiled counterexample sentence and its symbols in a worker process,
+# and the event set once any worker has found a counterexample
+partition = None
+stop = None
+
+
+def init_partition(counterexample, symbols, event):
+    """Compiles the counterexample sentence once per worker process."""
+    global partition, stop
+    partition = Compiled(counterexample, symbols)
+    stop = event
+
+
+def find_counterexample(prefix):
+    """
+    Checks if any model whose first symbols take the values in prefix
+    satisfies the counterexample sentence. Gives up early, returning
+    False, once another worker has found one.
+    """
+    rest = len(partition.symbols) - len(prefix)
+
+    # Check for cancellation once per block of 4096 models
+    block = min(rest, 12)
+    for middle in itertools.product((False, True), repeat=rest - block):
+        if stop.is_set():
+            return False
+        start = prefix + middle
+        for values in itertools.product((False, True), repeat=block):
+            if partition.evaluate(start + values):
+                return True
+    return False
+
+
+def parallel_model_check(knowledge, query, processes=None, split=None):
+    """
+    Checks if knowledge base entails query by fixing the values of the
+    first split symbols and checking each of the 2 ** split parts of the
+    models in a pool of processes. As soon as any part has a model where
+    the knowledge is true and the query false, the other parts stop.
+    """
+    counterexample = And(knowledge, Not(query))
+    symbols = sorted(counterexample.symbols())
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if split is None:
+
+        # About four parts per process, so that uneven parts balance out
+        split = (4 * processes - 1).bit_length()
+    split = min(split, len(symbols))
+
+    prefixes = list(itertools.product((False, True), repeat=split))
+    event = multiprocessing.Event()
+    entailed = True
+    with multiprocessing.Pool(
+        processes, init_partition, (counterexample, symbols, event)
+    ) as pool:
+
+        # Wait for every part, so the pool is idle when it is shut down;
+        # once the event is set the remaining parts return quickly
+        for found in pool.imap_unordered(find_counterexample, prefixes):
+            if found:
+                event.set()
+                entailed = False
+    return entailed
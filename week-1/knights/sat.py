@@ -0,0 +1,322 @@
+"""
+CNF conversion and DPLL satisfiability for logic sentences
+
+Sentences are converted to conjunctive normal form with the Tseitin
+encoding: every compound subsentence gets a fresh variable that is made
+equivalent to it, so the number of clauses grows linearly with the size
+of the sentence. Variables are numbered from 1 and literals are signed
+integers, as in the DIMACS format: 3 is variable 3, -3 is its negation.
+
+Solver runs DPLL search over the clauses, with unit propagation on two
+watched literals per clause and pure-literal elimination before search.
+A knowledge base entails a query exactly when the knowledge base together
+with the negated query has no satisfying model.
+"""
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses built up from sentences, with the variable number of each
+    symbol name.
+    """
+
+    def __init__(self):
+        self.variables = dict()
+        self.names = [None]
+        self.clauses = []
+
+        # Literal of each subsentence encoded so far
+        self.literals = dict()
+
+        # Variable that is always true, for empty conjunctions and
+        # disjunctions; created on first use
+        self.true = None
+
+    @property
+    def count(self):
+        """Returns the number of variables, including auxiliary ones."""
+        return len(self.names) - 1
+
+    def new_variable(self, name=None):
+        """Returns a new variable number."""
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def variable(self, name):
+        """Returns the variable number of a symbol name."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable(name)
+        return self.variables[name]
+
+    def constant(self, value):
+        """Returns a literal that is always true, or always false."""
+        if self.true is None:
+            self.true = self.new_variable()
+            self.clauses.append((self.true,))
+        return self.true if value else -self.true
+
+    def add(self, sentence):
+        """Adds clauses asserting that the sentence is true."""
+
+        # Conjunctions and disjunctions at the top level need no new
+        # variable of their own
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(tuple(
+                self.encode(disjunct) for disjunct in sentence.disjuncts
+            ))
+        elif isinstance(sentence, Implication):
+            self.clauses.append((
+                -self.encode(sentence.antecedent),
+                self.encode(sentence.consequent)
+            ))
+        else:
+            self.clauses.append((self.encode(sentence),))
+
+    def encode(self, sentence):
+        """
+        Returns a literal that is true exactly when the sentence is true,
+        adding the clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            if not sentence.conjuncts:
+                return self.constant(True)
+            operands = [self.encode(c) for c in sentence.conjuncts]
+            x = self.new_variable()
+            for operand in operands:
+                self.clauses.append((-x, operand))
+            self.clauses.append((x, *(-operand for operand in operands)))
+
+        elif isinstance(sentence, Or):
+            if not sentence.disjuncts:
+                return self.constant(False)
+            operands = [self.encode(d) for d in sentence.disjuncts]
+            x = self.new_variable()
+            for operand in operands:
+                self.clauses.append((x, -operand))
+            self.clauses.append((-x, *operands))
+
+        elif isinstance(sentence, Implication):
+            a = self.encode(sentence.antecedent)
+            b = self.encode(sentence.consequent)
+            x = self.new_variable()
+            self.clauses.extend([(-x, -a, b), (x, a), (x, -b)])
+
+        elif isinstance(sentence, Biconditional):
+            a = self.encode(sentence.left)
+            b = self.encode(sentence.right)
+            x = self.new_variable()
+            self.clauses.extend([
+                (-x, -a, b), (-x, a, -b), (x, a, b), (x, -a, -b)
+            ])
+
+        else:
+            raise TypeError(f"cannot convert {sentence!r} to CNF")
+
+        self.literals[sentence] = x
+        return x
+
+
+class Solver():
+    """
+    DPLL search over a list of clauses of signed integer literals.
+    """
+
+    def __init__(self, clauses, count):
+        self.count = count
+        self.clauses = []
+        self.units = []
+        self.empty = False
+
+        # Clauses watching each literal, indexed by literal + count
+        self.watches = [[] for _ in range(2 * count + 1)]
+
+        # Number of occurrences of each literal, for choosing decisions
+        # and finding pure literals
+        self.occurrences = [0] * (2 * count + 1)
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+        # Current assignment and the literals assigned, in order
+        self.value = [None] * (count + 1)
+        self.trail = []
+
+    def add_clause(self, clause):
+        """Adds a clause, dropping repeated literals and tautologies."""
+        literals = list(dict.fromkeys(clause))
+        if any(-literal in literals for literal in literals):
+            return
+        for literal in literals:
+            self.occurrences[literal + self.count] += 1
+        if not literals:
+            self.empty = True
+        elif len(literals) == 1:
+            self.units.append(literals[0])
+        else:
+            index = len(self.clauses)
+            self.clauses.append(literals)
+            self.watches[literals[0] + self.count].append(index)
+            self.watches[literals[1] + self.count].append(index)
+
+    def literal_value(self, literal):
+        """Returns True, False or None for a literal under the assignment."""
+        value = self.value[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def assign(self, literal):
+        """
+        Makes a literal true. Returns False if it is already false.
+        """
+        value = self.literal_value(literal)
+        if value is not None:
+            return value
+        self.value[abs(literal)] = literal > 0
+        self.trail.append(literal)
+        return True
+
+    def undo(self, length):
+        """Unassigns literals until the trail is back to the given length."""
+        while len(self.trail) > length:
+            self.value[abs(self.trail.pop())] = None
+
+    def propagate(self, start):
+        """
+        Assigns every literal forced by unit clauses, beginning with the
+        literals on the trail from index start. Returns False on conflict.
+        """
+        offset = self.count
+        head = start
+        while head < len(self.trail):
+            false_literal = -self.trail[head]
+            head += 1
+            watching = self.watches[false_literal + offset]
+            kept = []
+            conflict = False
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Keep the false literal second, the other watch first
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.literal_value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    if self.literal_value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1] + offset].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if not self.assign(clause[0]):
+                        kept.extend(watching[position + 1:])
+                        conflict = True
+                        break
+            watching[:] = kept
+            if conflict:
+                return False
+        return True
+
+    def pure_literals(self, assumptions):
+        """
+        Returns literals whose negation occurs in no clause, except for
+        variables that are assumed.
+        """
+        assumed = {abs(literal) for literal in assumptions}
+        pure = []
+        for variable in range(1, self.count + 1):
+            if variable in assumed:
+                continue
+            positive = self.occurrences[variable + self.count]
+            negative = self.occurrences[-variable + self.count]
+            if positive and not negative:
+                pure.append(variable)
+            elif negative and not positive:
+                pure.append(-variable)
+        return pure
+
+    def decisions(self):
+        """Returns literals to branch on, most frequent variable first."""
+        order = []
+        for variable in range(1, self.count + 1):
+            positive = self.occurrences[variable + self.count]
+            negative = self.occurrences[-variable + self.count]
+            literal = variable if positive >= negative else -variable
+            order.append((positive + negative, literal))
+        order.sort(key=lambda pair: -pair[0])
+        return [literal for _, literal in order]
+
+    def solve(self, assumptions=()):
+        """
+        Returns a satisfying model as a list of values indexed by variable
+        number, with every assumed literal true, or None if there is none.
+        """
+        try:
+            return self.search(assumptions)
+        finally:
+            self.undo(0)
+
+    def search(self, assumptions):
+        if self.empty:
+            return None
+        for literal in [*self.units, *assumptions,
+                        *self.pure_literals(assumptions)]:
+            if not self.assign(literal):
+                return None
+        if not self.propagate(0):
+            return None
+
+        order = self.decisions()
+
+        # Each level holds the trail length before its decision, the
+        # decision literal and whether its negation was already tried
+        levels = []
+        while True:
+            decision = next(
+                (literal for literal in order
+                 if self.value[abs(literal)] is None),
+                None
+            )
+            if decision is None:
+                return [False if value is None else value
+                        for value in self.value]
+
+            levels.append((len(self.trail), decision, False))
+            self.assign(decision)
+            start = levels[-1][0]
+            while not self.propagate(start):
+
+                # Backtrack to the latest decision with an untried branch
+                while levels and levels[-1][2]:
+                    self.undo(levels.pop()[0])
+                if not levels:
+                    return None
+                start, decision, _ = levels.pop()
+                self.undo(start)
+                levels.append((start, -decision, True))
+                self.assign(-decision)
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query by refuting its negation."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    literal = cnf.encode(query)
+    solver = Solver(cnf.clauses, cnf.count)
+    return solver.solve(assumptions=[-literal]) is None
@@ -0,0 +1,147 @@
+"""
+Headless Minesweeper benchmark for MinesweeperAI.
+
+Plays many seeded games on each board size across a pool of processes,
+without pygame. The AI plays as in runner.py: a known safe move when
+there is one, otherwise a guess. Reports, per board size, the win rate,
+moves per game, the time add_knowledge takes per move (inference), the
+time per guess, the largest knowledge base reached and the total time.
+
+Sizes are written HEIGHTxWIDTH, with mines in the same proportion as the
+8x8 board with 8 mines, or HEIGHTxWIDTH:MINES to set the mines.
+
+Guessers:
+    random      a uniformly random unknown cell
+    safest      the cell least likely to be a mine
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Fraction of cells that are mines unless a size says otherwise
+DENSITY = 8 / 64
+
+
+def parse_size(size):
+    """
+    Returns (height, width, mines) for a size such as 16x16 or 16x16:40.
+    """
+    dimensions, _, mines = size.partition(":")
+    height, width = (int(n) for n in dimensions.split("x"))
+    if mines:
+        mines = int(mines)
+    else:
+        mines = max(1, round(DENSITY * height * width))
+    if not 0 < mines < height * width:
+        raise ValueError(f"cannot place {mines} mines on {height}x{width}")
+    return height, width, mines
+
+
+def play_game(task):
+    """
+    Plays one game and returns (size, won, inference seconds per move,
+    guess seconds per guess, largest knowledge base, total seconds).
+    """
+    size, guesser, seed = task
+    height, width, mines = parse_size(size)
+    random.seed(seed)
+
+    start = time.perf_counter()
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    inference = []
+    guesses = []
+    largest = 0
+    won = False
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            guess_start = time.perf_counter()
+            if guesser == "safest":
+                move = ai.make_safest_move()
+            else:
+                move = ai.make_random_move()
+            guesses.append(time.perf_counter() - guess_start)
+            if move is None:
+                break
+        if game.is_mine(move):
+            break
+
+        move_start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        inference.append(time.perf_counter() - move_start)
+        largest = max(largest, len(ai.sentences))
+
+        if len(ai.moves_made) == height * width - mines:
+            won = True
+            break
+    return size, won, inference, guesses, largest, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at `fraction` through the sorted `values`.
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(fraction * len(values)))
+    return values[index]
+
+
+def report(games, sizes):
+    """
+    Prints win rate, timing and knowledge statistics per board size.
+    """
+    print(f"{'size':<14}{'games':>7}{'won':>8}{'moves':>8}"
+          f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'guess ms':>10}{'max kb':>8}{'total s':>9}")
+    for size in sizes:
+        results = [game for game in games if game[0] == size]
+        wins = sum(won for _, won, _, _, _, _ in results)
+        inference = sorted(t for game in results for t in game[2])
+        guesses = [t for game in results for t in game[3]]
+        largest = max(game[4] for game in results)
+        total = sum(game[5] for game in results)
+        guess_ms = 1000 * sum(guesses) / len(guesses) if guesses else 0.0
+        print(f"{size:<14}{len(results):>7}{wins / len(results):>8.1%}"
+              f"{len(inference) / len(results):>8.1f}"
+              + "".join(f"{1000 * percentile(inference, p):>9.3f}"
+                        for p in [0.5, 0.9, 0.99])
+              + f"{1000 * (inference[-1] if inference else 0.0):>9.3f}"
+              f"{guess_ms:>10.3f}{largest:>8}{total:>9.2f}")
+
+
+def main():
+    if len(sys.argv) < 4:
+        sys.exit("Usage: python bench_minesweeper.py games random|safest size [size ...]")
+    games_per_size = int(sys.argv[1])
+    guesser = sys.argv[2]
+    if guesser not in ["random", "safest"]:
+        sys.exit(f"Unknown guesser: {guesser}")
+    sizes = sys.argv[3:]
+    for size in sizes:
+        try:
+            parse_size(size)
+        except ValueError:
+            sys.exit(f"Invalid size: {size}")
+
+    tasks = [(size, guesser, seed)
+             for size in sizes
+             for seed in range(games_per_size)]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        games = pool.map(play_game, tasks, chunksize=max(1, len(tasks) // (4 * os.cpu_count())))
+    elapsed = time.perf_counter() - start
+
+    print(f"Played {len(games)} games with {guesser} guesses in {elapsed:.2f}s\n")
+    report(games, sizes)
+
+
+if __name__ == "__main__":
+    main()
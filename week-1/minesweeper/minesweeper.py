@@ -1,5 +1,8 @@
-import itertools
 import random
+from collections import deque
+from math import comb
+
+import numpy as np
 
 
 class Minesweeper():
@@ -12,23 +15,25 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
-
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Initialize an empty field, then add mines at distinct random cells,
+        # drawn by a generator seeded from random so that random.seed
+        # still fixes the board
+        self.board = np.zeros((height, width), dtype=bool)
+        rng = np.random.default_rng(random.getrandbits(64))
+        positions = rng.choice(height * width, size=mines, replace=False)
+        self.board.flat[positions] = True
+        rows, columns = np.divmod(positions, width)
+        self.mines = set(zip(rows.tolist(), columns.tolist()))
+
+        # Count the mines around every cell at once, by adding up the
+        # board shifted one step in each of the eight directions
+        padded = np.pad(self.board, 1).astype(np.uint8)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -50,7 +55,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -58,24 +63,8 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        return int(self.counts[i, j])
 
     def won(self):
         """
@@ -91,8 +80,10 @@ class Sentence():
     and a count of the number of those cells which are mines.
     """
 
+    __slots__ = ("cells", "count")
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = frozenset(cells)
         self.count = count
 
     def __eq__(self, other):
@@ -107,7 +98,7 @@ class Sentence():
         """
         if len(self.cells) == self.count:
             return self.cells
-        return set()
+        return frozenset()
 
     def known_safes(self):
         """
@@ -115,7 +106,7 @@ class Sentence():
         """
         if self.count == 0:
             return self.cells
-        return set()
+        return frozenset()
 
     def mark_mine(self, cell):
         """
@@ -123,7 +114,7 @@ class Sentence():
         a cell is known to be a mine.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            self.cells = self.cells - {cell}
             self.count -= 1
 
     def mark_safe(self, cell):
@@ -132,7 +123,7 @@ class Sentence():
         a cell is known to be safe.
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            self.cells = self.cells - {cell}
 
 
 class MinesweeperAI():
@@ -140,11 +131,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height and width, and the number of mines on the board
         self.height = height
         self.width = width
+        self.total_mines = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -153,8 +145,22 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Sentences about the game known to be true, keyed by their cells,
+        # so that a sentence is only stored once
+        self.sentences = dict()
+
+        # Keys of the sentences that contain each cell
+        self.containing = dict()
+
+        # Keys of new or changed sentences still to be examined
+        self.pending = deque()
+
+    @property
+    def knowledge(self):
+        """
+        List of sentences about the game known to be true.
+        """
+        return list(self.sentences.values())
 
     def mark_mine(self, cell):
         """
@@ -162,8 +168,10 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for key in list(self.containing.pop(cell, ())):
+            sentence = self.remove(key)
             sentence.mark_mine(cell)
+            self.insert(sentence)
 
     def mark_safe(self, cell):
         """
@@ -171,8 +179,34 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for key in list(self.containing.pop(cell, ())):
+            sentence = self.remove(key)
             sentence.mark_safe(cell)
+            self.insert(sentence)
+
+    def insert(self, sentence):
+        """
+        Adds a sentence to the knowledge base, unless it is empty or
+        already known, and queues it to be examined.
+        """
+        key = sentence.cells
+        if not key or key in self.sentences:
+            return
+        self.sentences[key] = sentence
+        for cell in key:
+            self.containing.setdefault(cell, set()).add(key)
+        self.pending.append(key)
+
+    def remove(self, key):
+        """
+        Removes and returns the sentence about the given cells.
+        """
+        sentence = self.sentences.pop(key)
+        for cell in key:
+            keys = self.containing.get(cell)
+            if keys is not None:
+                keys.discard(key)
+        return sentence
 
     def add_knowledge(self, cell, count):
         """
@@ -192,36 +226,52 @@ class MinesweeperAI():
         self.moves_made.add(cell)
         self.mark_safe(cell)
 
+        # Leave out neighbors already known to be safe or mines
         new_cell_set = set()
-
         for i in range(cell[0] - 1, cell[0] + 2):
             for j in range(cell[1] - 1, cell[1] + 2):
-                if 0 <= i < self.height and 0 <= j < self.width and (i,j) != cell:
-                    new_cell_set.add((i,j))
-
-        new_sentence = Sentence(new_cell_set, count)
-        self.knowledge.append(new_sentence)
-
-        for sentence in self.knowledge:
-            known_safes = sentence.known_safes().copy()
-            known_mines = sentence.known_mines().copy()
-            while known_safes != set():
-                safe_cell = known_safes.pop()
-                self.mark_safe(safe_cell)
-            
-            while known_mines != set():
-                mine_cell = known_mines.pop()
-                self.mark_mine(mine_cell)
-        
-        new_knowledge = []
-        for sentence1, sentence2 in itertools.combinations(self.knowledge, 2):
-            if sentence1.cells.issubset(sentence2.cells):
-                new_sentence_set = sentence2.cells - sentence1.cells
-                new_sentence_count = sentence2.count - sentence1.count
-                new_knowledge.append(Sentence(new_sentence_set, new_sentence_count))
-        
-        self.knowledge += new_knowledge
-        self.knowledge = [ sentence for sentence in self.knowledge if sentence != Sentence(set(), 0)]
+                if 0 <= i < self.height and 0 <= j < self.width and (i, j) != cell:
+                    if (i, j) in self.mines:
+                        count -= 1
+                    elif (i, j) not in self.safes:
+                        new_cell_set.add((i, j))
+
+        self.insert(Sentence(new_cell_set, count))
+        self.propagate()
+
+    def propagate(self):
+        """
+        Examines each new or changed sentence until none are left,
+        marking cells it proves safe or mines, and inferring new
+        sentences from the sentences that share cells with it.
+        """
+        while self.pending:
+            key = self.pending.popleft()
+            sentence = self.sentences.get(key)
+            if sentence is None:
+                continue
+
+            # Marking cells changes this sentence and queues what it touches
+            if sentence.known_safes() or sentence.known_mines():
+                for safe_cell in list(sentence.known_safes()):
+                    self.mark_safe(safe_cell)
+                for mine_cell in list(sentence.known_mines()):
+                    self.mark_mine(mine_cell)
+                continue
+
+            # Only sentences sharing a cell can be subsets or supersets
+            others = set()
+            for cell in key:
+                others |= self.containing[cell]
+            others.discard(key)
+            for other_key in others:
+                other = self.sentences[other_key]
+                if key < other_key:
+                    self.insert(Sentence(other_key - key,
+                                         other.count - sentence.count))
+                elif other_key < key:
+                    self.insert(Sentence(key - other_key,
+                                         sentence.count - other.count))
 
     def make_safe_move(self):
         """
@@ -245,7 +295,212 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        new_cell = ( random.randint(0, self.height - 1), random.randint(0, self.width - 1) )
-        while new_cell in self.mines or new_cell in self.moves_made:
-            new_cell = ( random.randint(0, self.height - 1), random.randint(0, self.width - 1) )
-        return new_cell
+        cells = self.unknown_cells()
+        if not cells:
+            return None
+        return random.choice(cells)
+
+    def make_safest_move(self):
+        """
+        Returns the cell least likely to be a mine, choosing randomly
+        among equally likely cells, or None if no moves are left.
+        """
+        probabilities = self.mine_probabilities()
+        if not probabilities:
+            return None
+        lowest = min(probabilities.values())
+        return random.choice([
+            cell for cell, probability in probabilities.items()
+            if probability <= lowest + 1e-9
+        ])
+
+    def unknown_cells(self):
+        """
+        Returns the cells that have not been chosen and are not known
+        to be mines.
+        """
+        return [
+            (i, j)
+            for i in range(self.height)
+            for j in range(self.width)
+            if (i, j) not in self.moves_made and (i, j) not in self.mines
+        ]
+
+    def mine_probabilities(self, limit=100000):
+        """
+        Returns the probability that each unknown cell is a mine.
+
+        Cells in some sentence (the frontier) are split into components
+        that share no sentence, and the mine configurations consistent
+        with each component's sentences are counted. A component whose
+        search takes more than `limit` steps is estimated instead. The
+        cells in no sentence can hold any of the remaining mines, so a
+        frontier with t mines is weighted by the number of ways to place
+        the rest among them.
+        """
+        unknown = self.unknown_cells()
+        frontier = {cell for key in self.sentences for cell in key}
+        interior = [cell for cell in unknown
+                    if cell not in frontier and cell not in self.safes]
+
+        # Mine counts for each component: the configurations with k mines
+        # and, for each cell, the configurations where it is a mine
+        components = []
+        for cells, sentences in self.components():
+            counts = self.count_configurations(cells, sentences, limit)
+            if counts is None:
+                counts = self.estimate_configurations(cells, sentences)
+            components.append((cells, counts))
+
+        remaining = self.total_mines - len(self.mines)
+
+        def weight(t):
+            """Ways to place the mines left over from t among the interior."""
+            rest = remaining - t
+            return comb(len(interior), rest) if 0 <= rest <= len(interior) else 0
+
+        def convolve(distributions):
+            """Returns the number of ways for the components to hold t mines."""
+            total = {0: 1}
+            for distribution in distributions:
+                combined = dict()
+                for t, ways in total.items():
+                    for k, (configurations, _) in distribution.items():
+                        combined[t + k] = combined.get(t + k, 0) + ways * configurations
+                total = combined
+            return total
+
+        totals = convolve([counts for _, counts in components])
+        normalizer = sum(ways * weight(t) for t, ways in totals.items())
+        if not normalizer:
+
+            # The mine count cannot be matched; weigh configurations evenly
+            def weight(t):
+                return 1
+            normalizer = sum(totals.values())
+
+        probabilities = {cell: 0.0 for cell in unknown}
+        for index, (cells, counts) in enumerate(components):
+            others = convolve([
+                other for i, (_, other) in enumerate(components) if i != index
+            ])
+            for k, (_, mine_counts) in counts.items():
+                factor = sum(ways * weight(k + t) for t, ways in others.items())
+                for cell, count in zip(cells, mine_counts):
+                    probabilities[cell] += count * factor / normalizer
+
+        if interior:
+            expected = sum(
+                ways * weight(t) * max(0, remaining - t)
+                for t, ways in totals.items()
+            ) / normalizer
+            for cell in interior:
+                probabilities[cell] = min(1.0, expected / len(interior))
+        return probabilities
+
+    def components(self):
+        """
+        Returns groups of frontier cells, with their sentences, such that
+        no sentence mentions cells from two groups.
+        """
+        parent = dict()
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for key in self.sentences:
+            cells = list(key)
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            for cell in cells[1:]:
+                parent[find(cell)] = find(cells[0])
+
+        groups = dict()
+        for key, sentence in self.sentences.items():
+            root = find(next(iter(key)))
+            groups.setdefault(root, []).append(sentence)
+
+        # Order each group's cells so that neighboring cells come together
+        # and sentences are completed early in the search
+        components = []
+        for sentences in groups.values():
+            cells = sorted({cell for sentence in sentences
+                            for cell in sentence.cells})
+            components.append((cells, sentences))
+        return components
+
+    def count_configurations(self, cells, sentences, limit):
+        """
+        Counts the mine configurations of the cells consistent with the
+        sentences, by number of mines. Returns a dict mapping k to the
+        number of configurations with k mines and a list, in cell order,
+        of how many of them have each cell as a mine; or None if the
+        search takes more than `limit` steps.
+        """
+        position = {cell: i for i, cell in enumerate(cells)}
+        needed = [sentence.count for sentence in sentences]
+        unassigned = [len(sentence.cells) for sentence in sentences]
+        touching = [[] for _ in cells]
+        for s, sentence in enumerate(sentences):
+            for cell in sentence.cells:
+                touching[position[cell]].append(s)
+
+        assignment = [False] * len(cells)
+        counts = dict()
+        steps = 0
+
+        # Depth-first search with an explicit stack of (cell, value) moves
+        stack = [(0, True), (0, False)]
+        path = []
+        while stack:
+            i, mine = stack.pop()
+
+            # Undo the moves of abandoned branches
+            while len(path) > i:
+                j, was_mine = path.pop()
+                for s in touching[j]:
+                    unassigned[s] += 1
+                    needed[s] += was_mine
+
+            steps += 1
+            if steps > limit:
+                return None
+
+            consistent = True
+            for s in touching[i]:
+                unassigned[s] -= 1
+                needed[s] -= mine
+                if needed[s] < 0 or needed[s] > unassigned[s]:
+                    consistent = False
+            path.append((i, mine))
+            assignment[i] = mine
+            if not consistent:
+                continue
+
+            if i + 1 < len(cells):
+                stack.append((i + 1, True))
+                stack.append((i + 1, False))
+            else:
+                k = sum(assignment)
+                configurations, mine_counts = counts.get(k, (0, [0] * len(cells)))
+                for j, value in enumerate(assignment):
+                    mine_counts[j] += value
+                counts[k] = (configurations + 1, mine_counts)
+        return counts
+
+    def estimate_configurations(self, cells, sentences):
+        """
+        Estimates the mine counts of a component too large to search,
+        taking each cell's probability to be the highest mine density
+        among its sentences.
+        """
+        density = {cell: 0.0 for cell in cells}
+        for sentence in sentences:
+            for cell in sentence.cells:
+                density[cell] = max(density[cell],
+                                    sentence.count / len(sentence.cells))
+        mine_counts = [density[cell] for cell in cells]
+        return {round(sum(mine_counts)): (1, mine_counts)}
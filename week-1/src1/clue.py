@@ -21,10 +21,13 @@ symbols = characters + rooms + weapons
 
 
 def check_knowledge(knowledge):
-    for symbol in symbols:
-        if model_check(knowledge, symbol):
+    kb = KnowledgeBase(knowledge)
+    yes = kb.entailed(symbols)
+    no = kb.entailed([Not(symbol) for symbol in symbols])
+    for symbol, entailed, refuted in zip(symbols, yes, no):
+        if entailed:
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif not refuted:
             print(f"{symbol}: MAYBE")
 
 
@@ -0,0 +1,66 @@
+"""
+Tests for logic.py: run with python -m pytest
+"""
+
+from logic import (
+    And, Biconditional, Implication, Not, Or, Symbol, model_check, parse
+)
+
+a = Symbol("a")
+b = Symbol("b")
+c = Symbol("c")
+
+
+def chain(depth):
+    """Returns a sentence nested `depth` levels deep."""
+    sentence = a
+    for i in range(depth // 2):
+        sentence = Not(Implication(sentence, Symbol(f"b{i % 5}")))
+    return sentence
+
+
+def test_nested_and_mutation():
+    inner = And(a)
+    outer = And(inner, Or(a, b))
+    negated = Not(inner)
+    assert outer.symbols() == {"a", "b"}
+    assert negated.symbols() == {"a"}
+    hash(outer)
+    hash(negated)
+
+    inner.add(c)
+    assert outer.symbols() == {"a", "b", "c"}
+    assert negated.symbols() == {"a", "c"}
+    assert outer == And(And(a, c), Or(a, b))
+    assert hash(outer) == hash(And(And(a, c), Or(a, b)))
+    assert negated == Not(And(a, c))
+    for backend in ["enumerate", "compiled", "vectorized", "dpll"]:
+        assert model_check(outer, c, backend=backend)
+
+
+def test_interned_caches_survive():
+    sentence = Implication(a, Not(b))
+    value = hash(sentence)
+    sentence.symbol_set()
+    assert Implication(Symbol("a"), Not(Symbol("b"))) is sentence
+    assert sentence._hash == value
+    assert sentence._symbols == {"a", "b"}
+
+
+def test_deep_model_check():
+    for depth in [600, 900]:
+        sentence = chain(depth)
+        assert len(sentence.symbols()) == 6
+        for backend in ["enumerate", "compiled"]:
+            assert model_check(sentence, a, backend=backend)
+
+
+def test_parse_deep_round_trip():
+    sentence = chain(600)
+    assert parse(sentence.formula()) == sentence
+
+    sentence = a
+    for i in range(300):
+        operator = [And, Or, Biconditional][i % 3]
+        sentence = operator(sentence, Symbol(f"b{i % 5}"))
+    assert parse(sentence.formula()) == sentence